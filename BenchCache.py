@@ -0,0 +1,255 @@
+import time
+import random
+import string
+import collections
+import tracemalloc
+import sys
+import gc
+
+# --- Configuration ---
+UNIVERSE = 200000            # Popular keys that keep coming back
+FRESH_RATE = 0.3             # Share of the feed that is brand-new keys (so the key space never ends)
+STREAM_LENGTH = 500000       # "Seen recently?" checks to run
+SEED = 42
+MAX_ENTRIES = 20000          # Entry budget for the bounded caches
+TTL_SECONDS = 0.5
+SEARCH_COUNT = 10000         # find()-only probes taken from the end of the stream
+ENTRY_OVERHEAD = 60          # Rough bytes per cached entry on top of the key itself (dict slot)
+BUCKET_OVERHEAD = 300        # Rough bytes per live bucket (CacheBucket, its dict, the parent's slot)
+
+# --- 1. 3-Layer Bucket (Unbounded "Control") ---
+class ThreeLayerList:
+    def __init__(self):
+        self.buckets = collections.defaultdict(
+            lambda: collections.defaultdict(
+                lambda: collections.defaultdict(list)
+            )
+        )
+    def add_unique(self, word):
+        c1, c2, c3 = word[0], word[1], word[2]
+        target_list = self.buckets[c1][c2][c3]
+        if word not in target_list:
+            target_list.append(word)
+    def find(self, word):
+        c1, c2, c3 = word[0], word[1], word[2]
+        if (c1 in self.buckets and c2 in self.buckets[c1] and c3 in self.buckets[c1][c2]):
+            return word in self.buckets[c1][c2][c3]
+        return False
+    def seen(self, word):
+        if self.find(word): return True
+        self.add_unique(word)
+        return False
+
+# --- 2. Bounded 3-Layer Cache ---
+class CacheBucket:
+    __slots__ = ("entries", "referenced", "parent", "key", "index")
+    def __init__(self, parent, key, index):
+        # key -> policy data (LRU: None, CLOCK: reference bit, TTL: expiry time).
+        # Insertion order is the eviction order: oldest / least recently used first.
+        # A plain dict, not an OrderedDict: half the bytes, and most buckets hold a handful.
+        self.entries = {}
+        self.referenced = False   # Bucket-level bit for the global CLOCK hand
+        self.parent = parent      # The layer-3 dict holding this bucket, so it can be released
+        self.key = key
+        self.index = index        # Position in the ring
+
+class BoundedLayeredCache:
+    # Two levels of eviction: a global CLOCK over buckets picks WHICH bucket gives up
+    # an entry (buckets hit since the hand last passed are skipped once), and only the
+    # order inside that bucket is true LRU / CLOCK / TTL. So "lru" is approximate across
+    # buckets: the least recently used entry overall is not always the one evicted.
+    def __init__(self, max_entries=MAX_ENTRIES, max_bytes=None, policy="lru", ttl=TTL_SECONDS):
+        if policy not in ("lru", "clock", "ttl"):
+            raise ValueError(f"unknown policy: {policy}")
+        self.max_entries = max_entries
+        self.max_bytes = max_bytes
+        self.policy = policy
+        self.ttl = ttl
+        self.buckets = {}
+        # Every live bucket, swept by a CLOCK hand to choose which bucket gives up
+        # an entry when the GLOBAL budget is exceeded
+        self.ring = []
+        self.hand = 0
+        self.entries = 0
+        self.bytes = 0
+        self.hits = self.misses = self.evictions = self.expirations = 0
+
+    def _bucket(self, word):
+        c1, c2, c3 = word[0], word[1], word[2]
+        level3 = self.buckets.setdefault(c1, {}).setdefault(c2, {})
+        bucket = level3.get(c3)
+        if bucket is None:
+            bucket = level3[c3] = CacheBucket(level3, c3, len(self.ring))
+            self.ring.append(bucket)
+            self.bytes += BUCKET_OVERHEAD
+        return bucket
+
+    def _release(self, bucket):
+        # Empty bucket: swap the ring's last bucket into its slot and forget it
+        last = self.ring.pop()
+        if last is not bucket:
+            self.ring[bucket.index] = last
+            last.index = bucket.index
+        del bucket.parent[bucket.key]
+        self.bytes -= BUCKET_OVERHEAD
+
+    def _drop(self, bucket, word):
+        del bucket.entries[word]
+        self.entries -= 1
+        self.bytes -= sys.getsizeof(word) + ENTRY_OVERHEAD
+
+    def _evict_from(self, bucket):
+        entries = bucket.entries
+        if self.policy == "clock":
+            # Second chance: referenced entries go to the back with their bit cleared
+            while True:
+                word = next(iter(entries))
+                if not entries.pop(word): break
+                entries[word] = False
+            entries[word] = False
+            self._drop(bucket, word)
+        else:
+            # LRU and TTL both evict the front: least recently used / soonest to expire
+            self._drop(bucket, next(iter(entries)))
+        self.evictions += 1
+
+    def _over_budget(self):
+        return self.entries > self.max_entries or (self.max_bytes is not None and self.bytes > self.max_bytes)
+
+    def _make_room(self):
+        # Global CLOCK over buckets: release empty ones, give referenced ones a second chance
+        while self._over_budget() and self.entries:
+            if self.hand >= len(self.ring): self.hand = 0
+            bucket = self.ring[self.hand]
+            if not bucket.entries:
+                self._release(bucket)    # Another bucket now sits under the hand
+                continue
+            self.hand += 1
+            if bucket.referenced:
+                bucket.referenced = False
+                continue
+            self._evict_from(bucket)
+
+    def _expire(self, bucket, now):
+        # TTL entries sit in expiry order, so expired ones are always at the front
+        entries = bucket.entries
+        while entries:
+            word, expiry = next(iter(entries.items()))
+            if expiry > now: break
+            self._drop(bucket, word)
+            self.expirations += 1
+
+    def find(self, word):
+        try:
+            bucket = self.buckets[word[0]][word[1]][word[2]]
+        except KeyError:
+            self.misses += 1
+            return False
+        entries = bucket.entries
+        if self.policy == "ttl": self._expire(bucket, time.monotonic())
+        if word in entries:
+            if self.policy == "lru": entries[word] = entries.pop(word)     # Move to the back
+            elif self.policy == "clock": entries[word] = True
+            bucket.referenced = True
+            self.hits += 1
+            return True
+        self.misses += 1
+        return False
+
+    def add(self, word):
+        bucket = self._bucket(word)
+        entries = bucket.entries
+        if self.policy == "ttl":
+            now = time.monotonic()
+            self._expire(bucket, now)
+            if word in entries:
+                # Refresh: remove and re-append so expiry order stays sorted
+                del entries[word]
+                entries[word] = now + self.ttl
+                bucket.referenced = True
+                return
+            entries[word] = now + self.ttl
+        elif word in entries:
+            if self.policy == "lru": entries[word] = entries.pop(word)
+            else: entries[word] = True
+            bucket.referenced = True
+            return
+        else:
+            entries[word] = False if self.policy == "clock" else None
+        # A fresh insert does NOT set the bucket bit: only hits earn a second chance
+        self.entries += 1
+        self.bytes += sys.getsizeof(word) + ENTRY_OVERHEAD
+        self._make_room()
+
+    def seen(self, word):
+        # The dedup-cache call: True if seen recently, otherwise remember it now
+        if self.find(word): return True
+        self.add(word)
+        return False
+
+# --- Setup Data ---
+print(f"--- BOUNDED CACHE DEMO ---")
+print(f"Universe: {UNIVERSE} keys  Stream: {STREAM_LENGTH} checks  Budget: {MAX_ENTRIES} entries")
+def key_for(n):
+    # 8 uppercase letters, scrambled so consecutive numbers land in different buckets
+    n = n * 2654435761 % 26 ** 8
+    return ''.join(string.ascii_uppercase[n // 26 ** i % 26] for i in range(8))
+
+def feed(seed):
+    # Skewed "seen recently?" feed: popular items come back often, fresh ones never repeat.
+    # Every key is a NEW string object, so a structure that holds on to keys pays for them.
+    rng = random.Random(seed)
+    fresh = UNIVERSE
+    for _ in range(STREAM_LENGTH):
+        if rng.random() < FRESH_RATE:
+            fresh += 1
+            yield key_for(fresh)
+        else:
+            yield key_for(min(int(rng.paretovariate(0.6)) - 1, UNIVERSE - 1))
+
+stream = list(feed(SEED))
+
+def run(make):
+    # Timed on the prebuilt stream without tracemalloc (it slows every allocation), then the
+    # same feed is replayed under it so the keys a structure keeps alive count as its memory
+    cache = make()
+    start = time.perf_counter()
+    repeats = sum(1 for word in stream if cache.seen(word))
+    elapsed = time.perf_counter() - start
+    gc.collect()
+    tracemalloc.start()
+    replay = make()
+    for word in feed(SEED): replay.seen(word)
+    held, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return cache, elapsed, repeats, held
+
+def find_only(cache, terms):
+    start = time.perf_counter()
+    for word in terms: cache.find(word)
+    return (time.perf_counter() - start) / len(terms)
+
+# --- BENCHMARK ---
+print(f"\n{'Structure':<20} {'Time':>8} {'ops/s':>10} {'Hit Rate':>9} {'Entries':>8} {'Evicted':>8} {'Expired':>8} {'Held':>9} {'find()':>8}")
+hot = stream[-SEARCH_COUNT:]
+unbounded, elapsed, repeats, held = run(ThreeLayerList)
+size = sum(len(l) for l2 in unbounded.buckets.values() for l3 in l2.values() for l in l3.values())
+print(f"{'Unbounded 3-Layer':<20} {elapsed:>7.2f}s {STREAM_LENGTH / elapsed:>10.0f} {repeats / STREAM_LENGTH * 100:>8.1f}% "
+      f"{size:>8} {'-':>8} {'-':>8} {held / 1024 / 1024:>6.2f} MB {find_only(unbounded, hot) * 1e6:>6.2f}us")
+
+for policy in ("lru", "clock", "ttl"):
+    cache, elapsed, repeats, held = run(lambda: BoundedLayeredCache(MAX_ENTRIES, policy=policy))
+    print(f"{'Bounded ' + policy.upper():<20} {elapsed:>7.2f}s {STREAM_LENGTH / elapsed:>10.0f} "
+          f"{repeats / STREAM_LENGTH * 100:>8.1f}% {cache.entries:>8} {cache.evictions:>8} "
+          f"{cache.expirations:>8} {held / 1024 / 1024:>6.2f} MB {find_only(cache, hot) * 1e6:>6.2f}us")
+
+# Byte budget instead of an entry budget
+cache, elapsed, repeats, held = run(lambda: BoundedLayeredCache(max_entries=UNIVERSE, max_bytes=1024 * 1024, policy="lru"))
+print(f"\nBounded LRU with a 1 MB byte budget: {cache.entries} entries, ~{cache.bytes / 1024 / 1024:.2f} MB accounted, "
+      f"{held / 1024 / 1024:.2f} MB held, {cache.evictions} evictions")
+print(f"Counters: hits {cache.hits}  misses {cache.misses}  evictions {cache.evictions}  expirations {cache.expirations}")
+
+# A hit must protect its bucket: with room for 2, the touched AAA1 stays and BBB1 goes
+check = BoundedLayeredCache(max_entries=2, policy="lru")
+check.add("AAA1"); check.add("BBB1"); check.find("AAA1"); check.add("CCC1")
+print(f"Hit protects its bucket: AAA1 kept {check.find('AAA1')}, BBB1 evicted {not check.find('BBB1')}")
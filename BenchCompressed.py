@@ -0,0 +1,266 @@
+import time
+import random
+import string
+import collections
+import tracemalloc
+import os
+import sys
+
+# --- Configuration ---
+PENDING_LIMIT = 32       # New keys a bucket collects before they're folded into its blob
+
+# --- Front Coding Helpers ---
+# A sorted bucket is stored as ONE blob instead of a list of objects.
+# Each entry is: [shared length][rest length][rest bytes]
+# where "shared" is how many leading bytes it has in common with the entry before it.
+# Lengths are varints (1 byte below 128), so any key length works. Fixed-size keys
+# pass size= and skip the rest length entirely: it is always size - shared.
+def put_varint(out, n):
+    while n >= 0x80:
+        out.append(n & 0x7F | 0x80)
+        n >>= 7
+    out.append(n)
+
+def get_varint(blob, pos):
+    n = shift = 0
+    while True:
+        b = blob[pos]
+        pos += 1
+        n |= (b & 0x7F) << shift
+        if b < 0x80: return n, pos
+        shift += 7
+
+def front_encode(sorted_items, size=None):
+    out = bytearray()
+    prev = b""
+    for item in sorted_items:
+        shared = 0
+        limit = min(len(prev), len(item))
+        while shared < limit and prev[shared] == item[shared]:
+            shared += 1
+        rest = item[shared:]
+        put_varint(out, shared)
+        if size is None: put_varint(out, len(rest))
+        out += rest
+        prev = item
+    return bytes(out)
+
+def front_decode(blob, size=None):
+    pos = 0
+    prev = b""
+    while pos < len(blob):
+        shared, pos = get_varint(blob, pos)
+        if size is None: n, pos = get_varint(blob, pos)
+        else: n = size - shared
+        item = prev[:shared] + blob[pos:pos + n]
+        pos += n
+        yield item
+        prev = item
+
+def front_contains(blob, item, size=None):
+    # Entries are sorted, so we can stop as soon as we walk past the target
+    for entry in front_decode(blob, size):
+        if entry == item: return True
+        if entry > item: return False
+    return False
+
+# --- 1. 3-Layer Bucket (The "Control") ---
+class ThreeLayerList:
+    def __init__(self):
+        self.buckets = collections.defaultdict(
+            lambda: collections.defaultdict(
+                lambda: collections.defaultdict(list)
+            )
+        )
+    def add_unique(self, word):
+        c1, c2, c3 = word[0], word[1], word[2]
+        target_list = self.buckets[c1][c2][c3]
+        if word not in target_list:
+            target_list.append(word)
+    def find(self, word):
+        c1, c2, c3 = word[0], word[1], word[2]
+        if (c1 in self.buckets and c2 in self.buckets[c1] and c3 in self.buckets[c1][c2]):
+            return word in self.buckets[c1][c2][c3]
+        return False
+
+# --- 2. Compressed N-Layer Bucket (Strings) ---
+class CompressedLayeredList:
+    def __init__(self, depth=3, pending_limit=PENDING_LIMIT):
+        # depth = how many leading characters pick the bucket (1-4 like the other benches)
+        # The prefix is the dictionary key, so it is NOT stored again inside the bucket.
+        # New suffixes wait in a small unsorted list per bucket; re-encoding the blob on
+        # every insert made the build ~25x slower than the plain lists.
+        self.depth = depth
+        self.pending_limit = pending_limit
+        self.buckets = {}    # prefix -> front-coded blob
+        self.pending = {}    # prefix -> suffixes not folded into the blob yet
+
+    def _fold(self, prefix):
+        items = list(front_decode(self.buckets.get(prefix, b"")))
+        items.extend(self.pending.pop(prefix))
+        items.sort()
+        self.buckets[prefix] = front_encode(items)
+
+    def seal(self):
+        # Fold every pending list, e.g. once a bulk load is done. The emptied dict is
+        # replaced, since a dict never shrinks its table when entries are popped.
+        for prefix in list(self.pending): self._fold(prefix)
+        self.pending = {}
+
+    def _contains(self, prefix, suffix):
+        pending = self.pending.get(prefix)
+        if pending is not None and suffix in pending: return True
+        blob = self.buckets.get(prefix)
+        return blob is not None and front_contains(blob, suffix)
+
+    def add_unique(self, word):
+        prefix, suffix = word[:self.depth], word[self.depth:].encode()
+        if self._contains(prefix, suffix): return
+        pending = self.pending.setdefault(prefix, [])
+        pending.append(suffix)
+        if len(pending) >= self.pending_limit: self._fold(prefix)
+
+    def find(self, word):
+        return self._contains(word[:self.depth], word[self.depth:].encode())
+
+# --- 3. 3-Layer Binary Lookup (The "Control") ---
+class BinaryThreeLayerList:
+    def __init__(self):
+        self.buckets = collections.defaultdict(
+            lambda: collections.defaultdict(
+                lambda: collections.defaultdict(list)
+            )
+        )
+    def add_unique(self, data_chunk):
+        b1, b2, b3 = data_chunk[0], data_chunk[1], data_chunk[2]
+        target_list = self.buckets[b1][b2][b3]
+        if data_chunk not in target_list:
+            target_list.append(data_chunk)
+    def find(self, data_chunk):
+        b1, b2, b3 = data_chunk[0], data_chunk[1], data_chunk[2]
+        if (b1 in self.buckets and b2 in self.buckets[b1] and b3 in self.buckets[b1][b2]):
+            return data_chunk in self.buckets[b1][b2][b3]
+        return False
+
+# --- 4. Compressed 3-Layer Binary Lookup ---
+class CompressedBinaryThreeLayerList:
+    def __init__(self, key_size=16, pending_limit=PENDING_LIMIT):
+        # Keyed by the first 3 bytes; each bucket stores only the remaining bytes, front-coded.
+        # Keys are fixed-size, so entries carry just the shared length (see front_encode).
+        self.key_size = key_size
+        self.suffix_size = key_size - 3
+        self.pending_limit = pending_limit
+        self.buckets = {}
+        self.pending = {}
+
+    def _fold(self, prefix):
+        items = list(front_decode(self.buckets.get(prefix, b""), self.suffix_size))
+        items.extend(self.pending.pop(prefix))
+        items.sort()
+        self.buckets[prefix] = front_encode(items, self.suffix_size)
+
+    def seal(self):
+        for prefix in list(self.pending): self._fold(prefix)
+        self.pending = {}
+
+    def _contains(self, prefix, suffix):
+        pending = self.pending.get(prefix)
+        if pending is not None and suffix in pending: return True
+        blob = self.buckets.get(prefix)
+        return blob is not None and front_contains(blob, suffix, self.suffix_size)
+
+    def add_unique(self, data_chunk):
+        # One wrong-length suffix would shift every entry after it in the blob
+        if len(data_chunk) != self.key_size:
+            raise ValueError(f"every key must be {self.key_size} bytes, got {len(data_chunk)}")
+        prefix, suffix = data_chunk[:3], data_chunk[3:]
+        if self._contains(prefix, suffix): return
+        pending = self.pending.setdefault(prefix, [])
+        pending.append(suffix)
+        if len(pending) >= self.pending_limit: self._fold(prefix)
+
+    def find(self, data_chunk):
+        if len(data_chunk) != self.key_size: return False
+        return self._contains(data_chunk[:3], data_chunk[3:])
+
+# --- Measurement Helper ---
+def build_and_measure(container, items):
+    # Returns (build seconds, bytes held by the container after the build).
+    # Compressed containers are sealed as part of the build, so the time includes folding.
+    tracemalloc.start()
+    start = time.perf_counter()
+    for item in items: container.add_unique(item)
+    if hasattr(container, "seal"): container.seal()
+    build_time = time.perf_counter() - start
+    held, _ = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return build_time, held
+
+def time_search(container, terms):
+    start = time.perf_counter()
+    for item in terms: container.find(item)
+    return time.perf_counter() - start
+
+# --- Setup Data (100,000 Items) ---
+print("Generating 100,000 words and 100,000 binary records...")
+# The key strings/bytes are created BEFORE tracemalloc starts, so both sides share them
+# and we only count what each structure adds on top (lists, dicts, blobs).
+word_pool = [''.join(random.choices(string.ascii_uppercase, k=6)) for _ in range(100000)]
+word_terms = [''.join(random.choices(string.ascii_uppercase, k=6)) for _ in range(1000)] + random.sample(word_pool, 1000)
+binary_pool = [os.urandom(16) for _ in range(100000)]
+binary_terms = [os.urandom(16) for _ in range(1000)] + random.sample(binary_pool, 1000)
+
+# The plain lists keep a reference to the shared key objects, but the compressed
+# buckets copy the key bytes into their blobs. To be fair we charge the plain
+# lists for the key objects they keep alive.
+word_key_bytes = sum(sys.getsizeof(w) for w in set(word_pool))
+binary_key_bytes = sum(sys.getsizeof(b) for b in set(binary_pool))
+
+# --- BENCHMARK: STRINGS ---
+print("\n--- STRING KEYS (6 chars, 3-char prefix) ---")
+layer3 = ThreeLayerList()
+compressed3 = CompressedLayeredList(depth=3)
+
+l3_build, l3_mem = build_and_measure(layer3, word_pool)
+c3_build, c3_mem = build_and_measure(compressed3, word_pool)
+l3_mem += word_key_bytes
+
+l3_search = time_search(layer3, word_terms)
+c3_search = time_search(compressed3, word_terms)
+
+print(f"3-Layer List:     build {l3_build:.4f} s  search {l3_search:.6f} s  memory {l3_mem / 1024 / 1024:.2f} MB")
+print(f"Compressed List:  build {c3_build:.4f} s  search {c3_search:.6f} s  memory {c3_mem / 1024 / 1024:.2f} MB")
+print(f"Space Saving:     {(1 - c3_mem / l3_mem) * 100:.1f}%")
+print(f"Lookup Cost:      {c3_search / l3_search:.2f}x the 3-Layer search time")
+
+# --- BENCHMARK: BINARY ---
+print("\n--- BINARY KEYS (16 bytes, 3-byte prefix) ---")
+binary3 = BinaryThreeLayerList()
+compressed_bin = CompressedBinaryThreeLayerList()
+
+b3_build, b3_mem = build_and_measure(binary3, binary_pool)
+cb_build, cb_mem = build_and_measure(compressed_bin, binary_pool)
+b3_mem += binary_key_bytes
+
+b3_search = time_search(binary3, binary_terms)
+cb_search = time_search(compressed_bin, binary_terms)
+
+print(f"3-Layer Binary:     build {b3_build:.4f} s  search {b3_search:.6f} s  memory {b3_mem / 1024 / 1024:.2f} MB")
+print(f"Compressed Binary:  build {cb_build:.4f} s  search {cb_search:.6f} s  memory {cb_mem / 1024 / 1024:.2f} MB")
+print(f"Space Saving:       {(1 - cb_mem / b3_mem) * 100:.1f}%")
+print(f"Lookup Cost:        {cb_search / b3_search:.2f}x the 3-Layer search time")
+
+# Sanity check: both sides must agree on every lookup
+agree = (all(layer3.find(w) == compressed3.find(w) for w in word_terms) and
+         all(binary3.find(b) == compressed_bin.find(b) for b in binary_terms))
+print(f"\nResults match the uncompressed lists: {agree}")
+
+# Long keys are fine too (varint lengths): e.g. a 300-byte suffix
+long_words = CompressedLayeredList(depth=3)
+long_words.add_unique("A" + "x" * 300)
+print(f"300+ byte key stored and found: {long_words.find('A' + 'x' * 300)}")
+# Binary keys are fixed-size: a wrong-length key is refused rather than corrupting its bucket
+try:
+    CompressedBinaryThreeLayerList(key_size=16).add_unique(os.urandom(23))
+except ValueError as e:
+    print(f"23-byte key in a 16-byte list: ValueError ({e})")
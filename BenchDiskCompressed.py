@@ -0,0 +1,227 @@
+import os
+import time
+import random
+import struct
+import zlib
+import shutil
+
+# --- Configuration ---
+COMPRESSED_ROOT = "my_compressed_index"  # Own folders, so the 16GB index from BenchDIsk.py is left alone
+RECORD_SIZE = 64         # Small index-style keys; use 65535 to match BenchDIsk.py
+TOTAL_RECORDS = 200000
+LOOKUP_COUNT = 20000
+PREFIX_SIZE = 3          # The 3 bytes that already picked the folder/bucket
+# Records are fixed-size, so an entry only needs its shared length; the rest length
+# is always (suffix size - shared). 1 byte covers small keys, 64KB records need 2.
+SHARED_HEADER = struct.Struct(">B" if RECORD_SIZE <= 255 else ">H")
+
+# --- Front Coding Helpers ---
+# Each entry is: [shared length][rest bytes], "shared" being how many leading bytes
+# it has in common with the entry before it.
+def front_encode(sorted_items):
+    out = bytearray()
+    prev = b""
+    for item in sorted_items:
+        shared = 0
+        limit = min(len(prev), len(item))
+        while shared < limit and prev[shared] == item[shared]:
+            shared += 1
+        out += SHARED_HEADER.pack(shared)
+        out += item[shared:]
+        prev = item
+    return bytes(out)
+
+def front_decode(blob, size):
+    pos = 0
+    prev = b""
+    while pos < len(blob):
+        shared, = SHARED_HEADER.unpack_from(blob, pos)
+        pos += SHARED_HEADER.size
+        n = size - shared
+        item = prev[:shared] + blob[pos:pos + n]
+        pos += n
+        yield item
+        prev = item
+
+# --- 1. The Disk Indexer (The "Control") ---
+class DiskIndexer:
+    def __init__(self, root_dir):
+        self.root = root_dir
+        if not os.path.exists(self.root):
+            os.makedirs(self.root)
+
+    def _get_path(self, data_chunk):
+        d1 = f"{data_chunk[0]:02x}"
+        d2 = f"{data_chunk[1]:02x}"
+        d3 = f"{data_chunk[2]:02x}"
+        folder_path = os.path.join(self.root, d1, d2)
+        file_path = os.path.join(folder_path, f"bucket_{d3}.bin")
+        return folder_path, file_path
+
+    def add(self, data_chunk):
+        folder_path, file_path = self._get_path(data_chunk)
+        os.makedirs(folder_path, exist_ok=True)
+        with open(file_path, "ab") as f:
+            f.write(data_chunk)
+
+    def find(self, data_chunk):
+        _, file_path = self._get_path(data_chunk)
+        if not os.path.exists(file_path): return False
+        with open(file_path, "rb") as f:
+            while True:
+                record = f.read(RECORD_SIZE)
+                if not record: break
+                if record == data_chunk: return True
+        return False
+
+# --- 2. The Compressed Disk Indexer ---
+class CompressedDiskIndexer:
+    def __init__(self, root_dir, compressor=None):
+        # compressor: anything with compress()/decompress() (zlib, lzma, bz2...) or None
+        self.root = root_dir
+        self.compressor = compressor
+        self.suffix_size = RECORD_SIZE - PREFIX_SIZE
+        if not os.path.exists(self.root):
+            os.makedirs(self.root)
+
+    def _get_path(self, data_chunk):
+        d1 = f"{data_chunk[0]:02x}"
+        d2 = f"{data_chunk[1]:02x}"
+        d3 = f"{data_chunk[2]:02x}"
+        folder_path = os.path.join(self.root, d1, d2)
+        base_path = os.path.join(folder_path, f"bucket_{d3}")
+        return folder_path, base_path
+
+    def add(self, data_chunk):
+        # New records land in an append-only ".tail" file with the prefix dropped.
+        # seal() later folds the tail into the sorted, front-coded ".fc" block.
+        folder_path, base_path = self._get_path(data_chunk)
+        os.makedirs(folder_path, exist_ok=True)
+        with open(base_path + ".tail", "ab") as f:
+            f.write(data_chunk[PREFIX_SIZE:])
+
+    def _read_block(self, block_path):
+        with open(block_path, "rb") as f:
+            blob = f.read()
+        if self.compressor is not None:
+            blob = self.compressor.decompress(blob)
+        return blob
+
+    def _seal_bucket(self, base_path):
+        items = []
+        if os.path.exists(base_path + ".fc"):
+            items.extend(front_decode(self._read_block(base_path + ".fc"), self.suffix_size))
+        with open(base_path + ".tail", "rb") as f:
+            while True:
+                record = f.read(self.suffix_size)
+                if not record: break
+                items.append(record)
+        items.sort()
+        blob = front_encode(items)
+        if self.compressor is not None:
+            blob = self.compressor.compress(blob)
+        with open(base_path + ".fc", "wb") as f:
+            f.write(blob)
+        os.remove(base_path + ".tail")
+
+    def seal(self):
+        # Rewrite every bucket with pending tail records into its compressed form
+        for folder_path, _, files in os.walk(self.root):
+            for name in files:
+                if name.endswith(".tail"):
+                    self._seal_bucket(os.path.join(folder_path, name[:-len(".tail")]))
+
+    def find(self, data_chunk):
+        _, base_path = self._get_path(data_chunk)
+        suffix = data_chunk[PREFIX_SIZE:]
+        if os.path.exists(base_path + ".fc"):
+            # Sorted block: stop as soon as we walk past the target
+            for entry in front_decode(self._read_block(base_path + ".fc"), self.suffix_size):
+                if entry == suffix: return True
+                if entry > suffix: break
+        if os.path.exists(base_path + ".tail"):
+            with open(base_path + ".tail", "rb") as f:
+                while True:
+                    record = f.read(self.suffix_size)
+                    if not record: break
+                    if record == suffix: return True
+        return False
+
+# --- Measurement Helper ---
+def disk_usage(root_dir):
+    # (logical bytes, allocated bytes) - allocated is what the page cache/disk really pays
+    logical = allocated = 0
+    for folder_path, _, files in os.walk(root_dir):
+        for name in files:
+            st = os.stat(os.path.join(folder_path, name))
+            logical += st.st_size
+            allocated += st.st_blocks * 512
+    return logical, allocated
+
+def time_lookups(indexer, lookup_list):
+    start = time.perf_counter()
+    hits = 0
+    for item in lookup_list:
+        if indexer.find(item): hits += 1
+    return time.perf_counter() - start, hits
+
+# --- SETUP ---
+print(f"--- COMPRESSED BUCKET DEMO ---")
+print(f"Record Size: {RECORD_SIZE} bytes")
+print(f"Total Records: {TOTAL_RECORDS}")
+
+for root in (COMPRESSED_ROOT + "_plain", COMPRESSED_ROOT + "_raw", COMPRESSED_ROOT + "_zlib"):
+    shutil.rmtree(root, ignore_errors=True)
+
+indexer = DiskIndexer(COMPRESSED_ROOT + "_plain")
+compressed = CompressedDiskIndexer(COMPRESSED_ROOT + "_raw")
+compressed_zlib = CompressedDiskIndexer(COMPRESSED_ROOT + "_zlib", compressor=zlib)
+
+known_targets = []
+
+print("\nStarting Stream: Generate -> Index (x3)...")
+start_time = time.perf_counter()
+for i in range(TOTAL_RECORDS):
+    chunk = os.urandom(RECORD_SIZE)
+    if len(known_targets) < 1000 and random.random() < 0.01:
+        known_targets.append(chunk)
+    indexer.add(chunk)
+    compressed.add(chunk)
+    compressed_zlib.add(chunk)
+    if i % 50000 == 0:
+        print(f"  Processed {i} records...")
+print(f"Generation Complete. Time: {time.perf_counter() - start_time:.2f}s")
+
+print("\nSealing compressed buckets...")
+start = time.perf_counter()
+compressed.seal()
+print(f"  Front-coded:        {time.perf_counter() - start:.2f}s")
+start = time.perf_counter()
+compressed_zlib.seal()
+print(f"  Front-coded + zlib: {time.perf_counter() - start:.2f}s")
+
+# --- SPACE ---
+print("\n--- SPACE RESULTS ---")
+raw_logical, raw_alloc = disk_usage(COMPRESSED_ROOT + "_plain")
+fc_logical, fc_alloc = disk_usage(COMPRESSED_ROOT + "_raw")
+z_logical, z_alloc = disk_usage(COMPRESSED_ROOT + "_zlib")
+print(f"Plain Buckets:       {raw_logical / 1024 / 1024:.2f} MB data  ({raw_alloc / 1024 / 1024:.2f} MB on disk)")
+print(f"Front-coded:         {fc_logical / 1024 / 1024:.2f} MB data  ({fc_alloc / 1024 / 1024:.2f} MB on disk)  saving {(1 - fc_logical / raw_logical) * 100:.1f}%")
+print(f"Front-coded + zlib:  {z_logical / 1024 / 1024:.2f} MB data  ({z_alloc / 1024 / 1024:.2f} MB on disk)  saving {(1 - z_logical / raw_logical) * 100:.1f}%")
+print("(Random records share nothing beyond the prefix, so zlib can only add overhead here.)")
+
+# --- LATENCY ---
+lookup_list = []
+for _ in range(LOOKUP_COUNT):
+    if random.random() > 0.5:
+        lookup_list.append(random.choice(known_targets))
+    else:
+        lookup_list.append(os.urandom(RECORD_SIZE))
+
+print(f"\n--- SEARCH BENCHMARK ({LOOKUP_COUNT} Accesses) ---")
+raw_time, raw_hits = time_lookups(indexer, lookup_list)
+fc_time, fc_hits = time_lookups(compressed, lookup_list)
+z_time, z_hits = time_lookups(compressed_zlib, lookup_list)
+print(f"Plain Buckets:       {raw_time:.4f}s  ({raw_time / LOOKUP_COUNT * 1000:.4f} ms/lookup, hits {raw_hits})")
+print(f"Front-coded:         {fc_time:.4f}s  ({fc_time / LOOKUP_COUNT * 1000:.4f} ms/lookup, hits {fc_hits})")
+print(f"Front-coded + zlib:  {z_time:.4f}s  ({z_time / LOOKUP_COUNT * 1000:.4f} ms/lookup, hits {z_hits})")
@@ -0,0 +1,192 @@
+import os
+import time
+import random
+import shutil
+import collections
+
+# --- Configuration ---
+DB_ROOT = "my_pooled_index"
+RECORD_SIZE = 4096
+TOTAL_RECORDS = 50000
+LOOKUP_COUNT = 100000
+MAX_OPEN_BUCKETS = 512       # Bucket file descriptors kept open (LRU)
+MAX_OPEN_DIRS = 256          # Second-level directory descriptors kept open (LRU)
+READ_BUFFER = 1024 * 1024    # Reusable read buffer; grows if a bucket is bigger
+
+# --- Precomputed Name Tables ---
+# Built once, so a lookup never formats a hex string or joins a path.
+HEX = [f"{i:02x}" for i in range(256)]
+BUCKET_NAMES = [f"bucket_{i:02x}.bin" for i in range(256)]
+
+# --- 1. The Disk Indexer (The "Control") ---
+class DiskIndexer:
+    def __init__(self, root_dir):
+        self.root = root_dir
+        if not os.path.exists(self.root):
+            os.makedirs(self.root)
+
+    def _get_path(self, data_chunk):
+        d1 = f"{data_chunk[0]:02x}"
+        d2 = f"{data_chunk[1]:02x}"
+        d3 = f"{data_chunk[2]:02x}"
+        folder_path = os.path.join(self.root, d1, d2)
+        file_path = os.path.join(folder_path, f"bucket_{d3}.bin")
+        return folder_path, file_path
+
+    def add(self, data_chunk):
+        folder_path, file_path = self._get_path(data_chunk)
+        os.makedirs(folder_path, exist_ok=True)
+        with open(file_path, "ab") as f:
+            f.write(data_chunk)
+
+    def find(self, data_chunk):
+        _, file_path = self._get_path(data_chunk)
+        if not os.path.exists(file_path): return False
+        with open(file_path, "rb") as f:
+            while True:
+                record = f.read(RECORD_SIZE)
+                if not record: break
+                if record == data_chunk: return True
+        return False
+
+# --- 2. The Pooled Disk Indexer (fd pool + pread) ---
+class PooledDiskIndexer:
+    def __init__(self, root_dir, max_open=MAX_OPEN_BUCKETS, max_dirs=MAX_OPEN_DIRS):
+        self.root = root_dir
+        if not os.path.exists(self.root):
+            os.makedirs(self.root)
+        self.max_open = max_open
+        self.max_dirs = max_dirs
+        self.dir_fds = collections.OrderedDict()     # (b1 << 8 | b2) -> directory fd
+        self.bucket_fds = collections.OrderedDict()  # (b1 << 16 | b2 << 8 | b3) -> read-only bucket fd
+        self.append_fds = collections.OrderedDict()  # Same keys -> O_APPEND fd, opened only by add()
+        self.buffer = bytearray(READ_BUFFER)
+        # "root/ab/cd/" for every (b1, b2), built once
+        self.dir_paths = [os.path.join(self.root, HEX[b1], HEX[b2], "") for b1 in range(256) for b2 in range(256)]
+
+    def _remember_dir(self, dir_key):
+        # Called once a bucket in this directory proved useful, so later opens of
+        # its neighbours are a single openat() with no path walk at all
+        fd = os.open(self.dir_paths[dir_key], os.O_RDONLY | os.O_DIRECTORY)
+        self.dir_fds[dir_key] = fd
+        if len(self.dir_fds) > self.max_dirs:
+            # Safe to close: bucket fds opened through it stay valid on their own
+            os.close(self.dir_fds.popitem(last=False)[1])
+
+    def _bucket_fd(self, data_chunk, create=False):
+        # Lookups open O_RDONLY, so find() works on a read-only index; add() keeps
+        # its own O_APPEND descriptors. Both see the same file, so reads stay current.
+        b1, b2, b3 = data_chunk[0], data_chunk[1], data_chunk[2]
+        key = b1 << 16 | b2 << 8 | b3
+        fds = self.append_fds if create else self.bucket_fds
+        fd = fds.get(key)
+        if fd is not None:
+            fds.move_to_end(key)
+            return fd
+        flags = (os.O_WRONLY | os.O_APPEND | os.O_CREAT) if create else os.O_RDONLY
+        dir_key = key >> 8
+        dir_fd = self.dir_fds.get(dir_key)
+        if dir_fd is not None:
+            self.dir_fds.move_to_end(dir_key)
+            fd = os.open(BUCKET_NAMES[b3], flags, 0o644, dir_fd=dir_fd)
+        else:
+            # Cold directory: one open() on a precomputed path. A miss costs exactly
+            # one failed syscall, the same as the os.path.exists() it replaces.
+            path = self.dir_paths[dir_key] + BUCKET_NAMES[b3]
+            try:
+                fd = os.open(path, flags, 0o644)
+            except FileNotFoundError:
+                if not create: raise
+                os.makedirs(self.dir_paths[dir_key], exist_ok=True)
+                fd = os.open(path, flags, 0o644)
+            self._remember_dir(dir_key)
+        fds[key] = fd
+        if len(fds) > self.max_open:
+            os.close(fds.popitem(last=False)[1])
+        return fd
+
+    def add(self, data_chunk):
+        os.write(self._bucket_fd(data_chunk, create=True), data_chunk)
+
+    def find(self, data_chunk):
+        try:
+            fd = self._bucket_fd(data_chunk)
+        except FileNotFoundError:
+            return False
+        # Whole bucket in one preadv() into the reusable buffer
+        n = os.preadv(fd, [self.buffer], 0)
+        while n == len(self.buffer):
+            # Bucket bigger than the buffer: grow it and read the rest
+            self.buffer.extend(bytes(len(self.buffer)))
+            n += os.preadv(fd, [memoryview(self.buffer)[n:]], n)
+        # Search in C with bytes.find; a hit only counts if it starts on a record boundary
+        pos = self.buffer.find(data_chunk, 0, n)
+        while pos != -1:
+            if pos % RECORD_SIZE == 0: return True
+            pos = self.buffer.find(data_chunk, pos + 1, n)
+        return False
+
+    def close(self):
+        for fd in self.bucket_fds.values(): os.close(fd)
+        for fd in self.append_fds.values(): os.close(fd)
+        for fd in self.dir_fds.values(): os.close(fd)
+        self.bucket_fds.clear()
+        self.append_fds.clear()
+        self.dir_fds.clear()
+
+# --- SETUP ---
+print(f"--- FD POOL + PREAD DEMO ---")
+print(f"Record Size: {RECORD_SIZE} bytes  Total Records: {TOTAL_RECORDS}  Lookups: {LOOKUP_COUNT}")
+print(f"Open Buckets: {MAX_OPEN_BUCKETS}  Open Dirs: {MAX_OPEN_DIRS}")
+
+shutil.rmtree(DB_ROOT, ignore_errors=True)
+indexer = DiskIndexer(DB_ROOT)
+known_targets = []
+
+print("\n--- PHASE 1: GENERATION ---")
+start_time = time.perf_counter()
+for i in range(TOTAL_RECORDS):
+    chunk = os.urandom(RECORD_SIZE)
+    if len(known_targets) < 100 and random.random() < 0.01:
+        known_targets.append(chunk)
+    indexer.add(chunk)
+print(f"Generation Complete. Time: {time.perf_counter() - start_time:.2f}s")
+
+pooled = PooledDiskIndexer(DB_ROOT)
+
+# 50% hits on a small hot set (like BenchDisk2.py), 50% random misses
+lookup_list = []
+for _ in range(LOOKUP_COUNT):
+    if random.random() > 0.5:
+        lookup_list.append(random.choice(known_targets))
+    else:
+        lookup_list.append(os.urandom(RECORD_SIZE))
+
+# --- PHASE 2: BENCHMARK ---
+print(f"\n--- PHASE 2: BENCHMARK ({LOOKUP_COUNT} Accesses) ---")
+start = time.perf_counter()
+plain_hits = sum(1 for item in lookup_list if indexer.find(item))
+plain_time = time.perf_counter() - start
+
+start = time.perf_counter()
+pooled_hits = sum(1 for item in lookup_list if pooled.find(item))
+pooled_time = time.perf_counter() - start
+
+print(f"DiskIndexer:        {plain_time:.4f}s  ({plain_time / LOOKUP_COUNT * 1e6:.1f} us/lookup, hits {plain_hits})")
+print(f"PooledDiskIndexer:  {pooled_time:.4f}s  ({pooled_time / LOOKUP_COUNT * 1e6:.1f} us/lookup, hits {pooled_hits})")
+print(f"Speed Increase:     {plain_time / pooled_time:.1f}x FASTER")
+
+# --- PHASE 3: INSERT ---
+new_items = [os.urandom(RECORD_SIZE) for _ in range(10000)]
+start = time.perf_counter()
+for item in new_items[:5000]: indexer.add(item)
+plain_add = time.perf_counter() - start
+start = time.perf_counter()
+for item in new_items[5000:]: pooled.add(item)
+pooled_add = time.perf_counter() - start
+print(f"\n--- INSERT (5000 new records each) ---")
+print(f"DiskIndexer:        {plain_add:.4f}s")
+print(f"PooledDiskIndexer:  {pooled_add:.4f}s")
+# Lookups use their own read-only fds; they must still see what add() just appended
+print(f"New records found:  {sum(1 for item in new_items if pooled.find(item))} / {len(new_items)}")
+pooled.close()
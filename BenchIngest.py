@@ -0,0 +1,257 @@
+import os
+import time
+import random
+import shutil
+import hashlib
+
+# --- Configuration ---
+NAIVE_ROOT = "my_ingest_naive"
+DEDUP_ROOT = "my_ingest_dedup"
+RECORD_SIZE = 1024
+STORE_RECORDS = 50000
+FEED_RECORDS = 50000         # Re-ingested feed: half already stored, some repeated inside the feed
+
+# --- 1. The Disk Indexer ---
+class DiskIndexer:
+    def __init__(self, root_dir):
+        self.root = root_dir
+        if not os.path.exists(self.root):
+            os.makedirs(self.root)
+
+    def _get_path(self, data_chunk):
+        d1 = f"{data_chunk[0]:02x}"
+        d2 = f"{data_chunk[1]:02x}"
+        d3 = f"{data_chunk[2]:02x}"
+        folder_path = os.path.join(self.root, d1, d2)
+        file_path = os.path.join(folder_path, f"bucket_{d3}.bin")
+        return folder_path, file_path
+
+    def add(self, data_chunk):
+        folder_path, file_path = self._get_path(data_chunk)
+        os.makedirs(folder_path, exist_ok=True)
+        with open(file_path, "ab") as f:
+            f.write(data_chunk)
+
+    def find(self, data_chunk):
+        _, file_path = self._get_path(data_chunk)
+        if not os.path.exists(file_path): return False
+        with open(file_path, "rb") as f:
+            while True:
+                record = f.read(RECORD_SIZE)
+                if not record: break
+                if record == data_chunk: return True
+        return False
+
+# --- 2. The Deduplicating Disk Indexer ---
+FINGERPRINT_SIZE = 16
+SIDECAR_NAME = "fingerprints.fp"
+SIDECAR_ENTRY = 2 + FINGERPRINT_SIZE     # [bytes 2-3 of the bucket prefix][fingerprint]
+
+def fingerprint(data_chunk):
+    # 128-bit digest: the odds of two different records colliding are negligible,
+    # so a fingerprint match is treated as a duplicate without touching the disk.
+    return hashlib.blake2b(data_chunk, digest_size=FINGERPRINT_SIZE).digest()
+
+class DedupDiskIndexer(DiskIndexer):
+    def __init__(self, root_dir, verify=False):
+        super().__init__(root_dir)
+        # One set of fingerprints per bucket, keyed by the 3-byte prefix.
+        # Fingerprints are also persisted: each top-level folder (root/ab/) has a
+        # fingerprints.fp sidecar, appended on every write, with one 18-byte entry per
+        # record. Loading filters reads those entries instead of re-reading and
+        # re-hashing the records. (One sidecar per bucket would cost as many file opens
+        # as reading the buckets themselves: most buckets hold a single record.)
+        # A folder's sidecar is loaded the first time one of its buckets is touched
+        # (or all at once by load_filters); the sets then track every add.
+        # verify=True re-reads the bucket to confirm every fingerprint match.
+        self.filters = {}
+        self.loaded = set()      # Top-level folders whose sidecar is already in self.filters
+        self.sidecars = {}       # Top-level folder byte -> open O_APPEND descriptor
+        self.verify = verify
+
+    def _load_folder(self, b1):
+        self.loaded.add(b1)
+        folder_path = os.path.join(self.root, f"{b1:02x}")
+        if not os.path.isdir(folder_path): return
+        sidecar_path = os.path.join(folder_path, SIDECAR_NAME)
+        try:
+            with open(sidecar_path, "rb") as f:
+                blob = f.read()
+        except FileNotFoundError:
+            # Folder written without a sidecar (e.g. by a plain DiskIndexer): hash its
+            # records once and write the sidecar so the next start doesn't have to
+            blob = self._rebuild_sidecar(folder_path, sidecar_path)
+        # Records are written before their entry, so a crash between the two can only
+        # lose an entry: the record is then written again, never silently skipped
+        prefix = bytes([b1])
+        for i in range(0, len(blob) - SIDECAR_ENTRY + 1, SIDECAR_ENTRY):
+            key = prefix + blob[i:i + 2]
+            fingerprints = self.filters.get(key)
+            if fingerprints is None:
+                fingerprints = self.filters[key] = set()
+            fingerprints.add(blob[i + 2:i + SIDECAR_ENTRY])
+
+    def _rebuild_sidecar(self, folder_path, sidecar_path):
+        entries = []
+        for d2 in sorted(os.listdir(folder_path)):
+            if d2 == SIDECAR_NAME: continue
+            for name in sorted(os.listdir(os.path.join(folder_path, d2))):
+                if not (name.startswith("bucket_") and name.endswith(".bin")): continue
+                tail = bytes.fromhex(d2 + name[7:9])
+                with open(os.path.join(folder_path, d2, name), "rb") as f:
+                    while True:
+                        record = f.read(RECORD_SIZE)
+                        if not record: break
+                        entries.append(tail + fingerprint(record))
+        blob = b"".join(entries)
+        with open(sidecar_path, "wb") as f:
+            f.write(blob)
+        return blob
+
+    def _filter(self, data_chunk):
+        key = data_chunk[:3]
+        fingerprints = self.filters.get(key)
+        if fingerprints is None:
+            if data_chunk[0] not in self.loaded:
+                self._load_folder(data_chunk[0])
+                fingerprints = self.filters.get(key)
+            if fingerprints is None:
+                fingerprints = self.filters[key] = set()
+        return fingerprints
+
+    def load_filters(self):
+        # Warm every filter from the sidecars, e.g. right after a restart
+        for b1 in range(256):
+            if b1 not in self.loaded: self._load_folder(b1)
+
+    def _write(self, file_path, data_chunk, fp):
+        # Record first, then its sidecar entry (see _load_folder)
+        b1 = data_chunk[0]
+        if b1 not in self.loaded:
+            # Make sure an existing folder has a complete sidecar before appending to it
+            self._load_folder(b1)
+        with open(file_path, "ab") as f:
+            f.write(data_chunk)
+        fd = self.sidecars.get(b1)
+        if fd is None:
+            sidecar_path = os.path.join(self.root, f"{b1:02x}", SIDECAR_NAME)
+            fd = self.sidecars[b1] = os.open(sidecar_path, os.O_WRONLY | os.O_APPEND | os.O_CREAT, 0o644)
+        os.write(fd, data_chunk[1:3] + fp)
+
+    def add(self, data_chunk):
+        folder_path, file_path = self._get_path(data_chunk)
+        os.makedirs(folder_path, exist_ok=True)
+        fp = fingerprint(data_chunk)
+        self._write(file_path, data_chunk, fp)
+        # _filter creates the set for a bucket this index has never seen
+        self._filter(data_chunk).add(fp)
+
+    def find(self, data_chunk):
+        # A fingerprint miss is a guaranteed miss - no disk read needed
+        if fingerprint(data_chunk) not in self._filter(data_chunk): return False
+        return not self.verify or super().find(data_chunk)
+
+    def ingest_unique(self, stream):
+        # Consumes any iterable of records and yields only the ones it actually wrote.
+        # Checking a record costs one hash + one set lookup instead of a bucket scan;
+        # paths are only built for records that actually get written.
+        for data_chunk in stream:
+            fingerprints = self._filter(data_chunk)
+            fp = fingerprint(data_chunk)
+            if fp in fingerprints and (not self.verify or super().find(data_chunk)): continue
+            folder_path, file_path = self._get_path(data_chunk)
+            if not fingerprints:
+                # Non-empty bucket => its folder already exists
+                os.makedirs(folder_path, exist_ok=True)
+            self._write(file_path, data_chunk, fp)
+            fingerprints.add(fp)
+            yield data_chunk
+
+    def close(self):
+        for fd in self.sidecars.values(): os.close(fd)
+        self.sidecars.clear()
+
+# --- Measurement Helper ---
+def disk_bytes(root_dir):
+    total = 0
+    for folder_path, _, files in os.walk(root_dir):
+        for name in files:
+            total += os.path.getsize(os.path.join(folder_path, name))
+    return total
+
+# --- SETUP ---
+print(f"--- DEDUPLICATING INGEST DEMO ---")
+print(f"Record Size: {RECORD_SIZE} bytes  Store: {STORE_RECORDS}  Feed: {FEED_RECORDS}")
+
+shutil.rmtree(NAIVE_ROOT, ignore_errors=True)
+shutil.rmtree(DEDUP_ROOT, ignore_errors=True)
+naive = DiskIndexer(NAIVE_ROOT)
+builder = DedupDiskIndexer(DEDUP_ROOT)   # Writes the fingerprint sidecars as it goes
+
+print("\nBuilding the store (twice, one copy per method)...")
+stored = []
+for i in range(STORE_RECORDS):
+    chunk = os.urandom(RECORD_SIZE)
+    stored.append(chunk)
+    naive.add(chunk)
+    builder.add(chunk)
+
+# Feed: 50% records we already have, 40% new, 10% repeats from inside the feed itself
+fresh = [os.urandom(RECORD_SIZE) for _ in range(FEED_RECORDS * 4 // 10)]
+feed = random.sample(stored, FEED_RECORDS // 2) + fresh
+feed += random.sample(fresh, FEED_RECORDS - len(feed))
+random.shuffle(feed)
+expected_new = len(fresh)
+
+# --- BENCHMARK ---
+print(f"\n--- INGEST BENCHMARK ({len(feed)} records, {expected_new} genuinely new) ---")
+
+# 1. Naive: a full find() before every add()
+os.sync()   # Flush the build's dirty pages so neither method pays for them
+start = time.perf_counter()
+naive_added = 0
+for chunk in feed:
+    if not naive.find(chunk):
+        naive.add(chunk)
+        naive_added += 1
+naive_time = time.perf_counter() - start
+
+# 2. ingest_unique, starting cold as if the process had just restarted
+builder.close()
+os.sync()
+dedup = DedupDiskIndexer(DEDUP_ROOT)
+start = time.perf_counter()
+dedup.load_filters()
+load_time = time.perf_counter() - start
+start = time.perf_counter()
+dedup_added = sum(1 for _ in dedup.ingest_unique(feed))
+dedup_time = time.perf_counter() - start
+
+print(f"find() + add():                 {naive_time:.4f}s  (added {naive_added})")
+print(f"filter load (from sidecars):    {load_time:.4f}s")
+print(f"ingest_unique():                {dedup_time:.4f}s  (added {dedup_added})")
+print(f"load + ingest_unique():         {load_time + dedup_time:.4f}s  Speedup: {naive_time / (load_time + dedup_time):.1f}x")
+print("(Both pay the same cost to WRITE the new records; the difference is the duplicate check.)")
+
+# Replaying the same feed again: everything is a duplicate, so this is pure check cost
+print(f"\n--- REPLAY BENCHMARK (same {len(feed)} records again, all duplicates) ---")
+start = time.perf_counter()
+naive_replay = sum(1 for chunk in feed if not naive.find(chunk))
+naive_replay_time = time.perf_counter() - start
+start = time.perf_counter()
+dedup_replay = sum(1 for _ in dedup.ingest_unique(feed))
+dedup_replay_time = time.perf_counter() - start
+print(f"find() per record:     {naive_replay_time:.4f}s  (new {naive_replay})")
+print(f"ingest_unique():       {dedup_replay_time:.4f}s  (new {dedup_replay})  {naive_replay_time / dedup_replay_time:.1f}x FASTER")
+
+# 3. What happens with plain add() and no check at all
+bloated = disk_bytes(NAIVE_ROOT) + len(feed) * RECORD_SIZE - naive_added * RECORD_SIZE
+print(f"\nStore size after dedup ingest:  {disk_bytes(DEDUP_ROOT) / 1024 / 1024:.2f} MB")
+print(f"Store size with plain add():    {bloated / 1024 / 1024:.2f} MB (every duplicate written again)")
+
+# Same instance, no reload: add() must be visible to find() and ingest_unique() at once
+extra = [os.urandom(RECORD_SIZE) for _ in range(100)]
+for chunk in extra: dedup.add(chunk)
+print(f"\nSame-instance add() -> find(): {sum(1 for chunk in extra if dedup.find(chunk))}/{len(extra)} found, "
+      f"ingest_unique() rewrote {sum(1 for _ in dedup.ingest_unique(extra))}")
+dedup.close()
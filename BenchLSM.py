@@ -0,0 +1,319 @@
+import os
+import time
+import random
+import collections
+import threading
+import shutil
+import bisect
+
+# --- Configuration ---
+DB_ROOT = "my_tiered_store"
+RECORD_SIZE = 32             # Fixed-size records, so sorted run files can be binary searched
+TOTAL_RECORDS = 500000
+MEMTABLE_RECORDS = 50000     # Max records held in RAM by ONE memtable (~1.5 MB at 32 bytes)
+MAX_RUNS = 4                 # More runs than this and the smallest ones get merged
+LOOKUP_COUNT = 20000
+
+# --- 1. The Memtable (a plain set) ---
+class MemTable:
+    def __init__(self):
+        # Only add/contains are needed until the flush sorts everything once, so a set
+        # beats nested bucket dicts: no dicts to build on every swap, none for GC to scan
+        self.records = set()
+    @property
+    def count(self):
+        return len(self.records)
+    def add_unique(self, data_chunk):
+        self.records.add(data_chunk)
+    def find(self, data_chunk):
+        return data_chunk in self.records
+    def sorted_buckets(self):
+        # Yields (first byte, sorted records) in prefix order - exactly the layout of a run
+        records = sorted(self.records)
+        start = 0
+        while start < len(records):
+            b1 = records[start][0]
+            end = bisect.bisect_left(records, bytes([b1 + 1]), start) if b1 < 255 else len(records)
+            yield b1, records[start:end]
+            start = end
+
+# --- 2. An Immutable Sorted Run on Disk ---
+class SortedRun:
+    # One folder per run, one sorted file per leading byte: run_000007/bucket_3f.bin
+    def __init__(self, path, counts):
+        self.path = path
+        self.counts = counts      # {first byte: records in that bucket file}
+        self.size = sum(counts.values())
+
+    def _bucket_path(self, b1):
+        return os.path.join(self.path, f"bucket_{b1:02x}.bin")
+
+    @classmethod
+    def write(cls, path, sorted_buckets):
+        os.makedirs(path)
+        counts = {}
+        for b1, records in sorted_buckets:
+            with open(os.path.join(path, f"bucket_{b1:02x}.bin"), "wb") as f:
+                f.write(b"".join(records))
+            counts[b1] = len(records)
+        return cls(path, counts)
+
+    def find(self, data_chunk):
+        n = self.counts.get(data_chunk[0])
+        if not n: return False
+        # Binary search straight on the file: log2(n) positional reads, no full scan
+        fd = os.open(self._bucket_path(data_chunk[0]), os.O_RDONLY)
+        try:
+            lo, hi = 0, n
+            while lo < hi:
+                mid = (lo + hi) // 2
+                record = os.pread(fd, RECORD_SIZE, mid * RECORD_SIZE)
+                if record == data_chunk: return True
+                if record < data_chunk: lo = mid + 1
+                else: hi = mid
+        finally:
+            os.close(fd)
+        return False
+
+    def records(self, b1):
+        # A whole leading-byte bucket at once: 1/256 of the run, so merges can work
+        # in blocks instead of one record at a time
+        if not self.counts.get(b1): return []
+        with open(self._bucket_path(b1), "rb") as f:
+            blob = f.read()
+        return [blob[i:i + RECORD_SIZE] for i in range(0, len(blob), RECORD_SIZE)]
+
+# --- 3. The Tiered (LSM) Store ---
+class TieredStore:
+    def __init__(self, root_dir, memtable_records=MEMTABLE_RECORDS, max_runs=MAX_RUNS):
+        self.root = root_dir
+        self.memtable_records = memtable_records
+        self.max_runs = max_runs
+        if not os.path.exists(self.root):
+            os.makedirs(self.root)
+        self.memtable = MemTable()
+        self.immutable = None        # The full memtable currently being flushed
+        self.runs = []               # Newest first. Always REPLACED, never edited in place.
+        self.next_run = 0
+        self.peak_in_memory = 0      # Most records ever held in RAM at once (active + flushing)
+        self.stalls = 0              # Times add() had to wait for a flush (back-pressure)
+        self.flush_seconds = 0.0     # CPU seconds spent by the background threads
+        self.merge_seconds = 0.0
+        self.lock = threading.Lock()
+        self.flushed = threading.Condition(self.lock)
+        self.flush_wanted = threading.Event()
+        self.merge_wanted = threading.Event()
+        self.closing = False
+        self.flusher = threading.Thread(target=self._flush_loop, daemon=True)
+        self.merger = threading.Thread(target=self._merge_loop, daemon=True)
+        self.flusher.start()
+        self.merger.start()
+
+    def _new_run_path(self):
+        with self.lock:
+            path = os.path.join(self.root, f"run_{self.next_run:06d}")
+            self.next_run += 1
+        return path
+
+    def add(self, data_chunk):
+        records = self.memtable.records
+        records.add(data_chunk)
+        if len(records) >= self.memtable_records:
+            with self.lock:
+                # The active memtable is at its cap here, so this is the most we ever hold
+                in_memory = self.memtable.count + (self.immutable.count if self.immutable is not None else 0)
+                self.peak_in_memory = max(self.peak_in_memory, in_memory)
+                # Back-pressure: at most ONE full memtable waits for disk, so RAM is
+                # capped at 2 x memtable_records no matter how fast we ingest.
+                if self.immutable is not None: self.stalls += 1
+                while self.immutable is not None:
+                    self.flushed.wait()
+                self.immutable = self.memtable
+                self.memtable = MemTable()
+            self.flush_wanted.set()
+
+    def _flush_loop(self):
+        while True:
+            self.flush_wanted.wait()
+            self.flush_wanted.clear()
+            if self.immutable is None:
+                if self.closing: return
+                continue
+            start = time.thread_time()
+            run = SortedRun.write(self._new_run_path(), self.immutable.sorted_buckets())
+            self.flush_seconds += time.thread_time() - start
+            with self.lock:
+                self.runs = [run] + self.runs
+                self.immutable = None
+                self.flushed.notify_all()
+                if len(self.runs) > self.max_runs:
+                    self.merge_wanted.set()
+
+    def _pick_merge(self):
+        # Merge just enough runs to get back to max_runs, picking the SMALLEST ones, so
+        # the big run from earlier merges is only rewritten once the rest catch up with it.
+        # (Every run is a set of unique records, so run order doesn't matter for find().)
+        with self.lock:
+            extra = len(self.runs) - self.max_runs
+            if extra <= 0: return None
+            return sorted(self.runs, key=lambda run: run.size)[:extra + 1]
+
+    def _merge(self, chosen):
+        start = time.thread_time()
+        b1s = sorted(set().union(*(run.counts for run in chosen)))
+        # Merged in blocks: each leading byte is read whole from every run and
+        # deduplicated/sorted in C, instead of a per-record heapq.merge in Python
+        merged_buckets = ((b1, sorted(set().union(*(run.records(b1) for run in chosen)))) for b1 in b1s)
+        merged = SortedRun.write(self._new_run_path(), merged_buckets)
+        with self.lock:
+            # New flushes may have landed meanwhile; they stay in front (they're newer)
+            self.runs = [run for run in self.runs if run not in chosen] + [merged]
+        for run in chosen:
+            shutil.rmtree(run.path, ignore_errors=True)
+        self.merge_seconds += time.thread_time() - start
+
+    def _merge_loop(self):
+        while True:
+            self.merge_wanted.wait()
+            self.merge_wanted.clear()
+            while True:
+                chosen = self._pick_merge()
+                if chosen is None: break
+                self._merge(chosen)
+            # Only stop once the final flush has been merged down to max_runs
+            if self.closing: return
+
+    def find(self, data_chunk):
+        # Memory first, then disk runs newest -> oldest
+        if self.memtable.find(data_chunk): return True
+        immutable = self.immutable
+        if immutable is not None and immutable.find(data_chunk): return True
+        while True:
+            try:
+                for run in self.runs:
+                    if run.find(data_chunk): return True
+                return False
+            except FileNotFoundError:
+                # A merge replaced (and deleted) a run we were reading; the merged
+                # run is already published, so just look again.
+                continue
+
+    def close(self):
+        # Push whatever is left in RAM to disk and stop the background threads
+        with self.lock:
+            while self.immutable is not None:
+                self.flushed.wait()
+            if self.memtable.count:
+                self.immutable = self.memtable
+                self.memtable = MemTable()
+        self.flush_wanted.set()
+        with self.lock:
+            while self.immutable is not None:
+                self.flushed.wait()
+        self.closing = True
+        self.flush_wanted.set()
+        self.merge_wanted.set()
+        self.flusher.join()
+        self.merger.join()
+
+# --- 4. 3-Layer Binary Lookup (RAM Speed "Control") ---
+class BinaryThreeLayerList:
+    def __init__(self):
+        self.buckets = collections.defaultdict(
+            lambda: collections.defaultdict(
+                lambda: collections.defaultdict(list)
+            )
+        )
+    def add_unique(self, data_chunk):
+        b1, b2, b3 = data_chunk[0], data_chunk[1], data_chunk[2]
+        target_list = self.buckets[b1][b2][b3]
+        if data_chunk not in target_list:
+            target_list.append(data_chunk)
+    def find(self, data_chunk):
+        b1, b2, b3 = data_chunk[0], data_chunk[1], data_chunk[2]
+        if (b1 in self.buckets and b2 in self.buckets[b1] and b3 in self.buckets[b1][b2]):
+            return data_chunk in self.buckets[b1][b2][b3]
+        return False
+
+# --- 5. The Disk Indexer (Capacity "Control") ---
+class DiskIndexer:
+    def __init__(self, root_dir):
+        self.root = root_dir
+        if not os.path.exists(self.root):
+            os.makedirs(self.root)
+    def _get_path(self, data_chunk):
+        d1 = f"{data_chunk[0]:02x}"
+        d2 = f"{data_chunk[1]:02x}"
+        d3 = f"{data_chunk[2]:02x}"
+        folder_path = os.path.join(self.root, d1, d2)
+        file_path = os.path.join(folder_path, f"bucket_{d3}.bin")
+        return folder_path, file_path
+    def add(self, data_chunk):
+        folder_path, file_path = self._get_path(data_chunk)
+        os.makedirs(folder_path, exist_ok=True)
+        with open(file_path, "ab") as f:
+            f.write(data_chunk)
+
+# --- SETUP ---
+print(f"--- TIERED MEMORY + DISK STORE ---")
+print(f"Record Size: {RECORD_SIZE} bytes  Total Records: {TOTAL_RECORDS}")
+print(f"Memtable Cap: {MEMTABLE_RECORDS} records ({MEMTABLE_RECORDS * RECORD_SIZE / 1024 / 1024:.2f} MB)  Max Runs: {MAX_RUNS}")
+
+shutil.rmtree(DB_ROOT, ignore_errors=True)
+shutil.rmtree(DB_ROOT + "_indexer", ignore_errors=True)
+store = TieredStore(DB_ROOT)
+ram_only = BinaryThreeLayerList()
+indexer = DiskIndexer(DB_ROOT + "_indexer")
+
+stream = [os.urandom(RECORD_SIZE) for _ in range(TOTAL_RECORDS)]
+
+# --- BENCHMARK: INGEST ---
+print("\n--- INGEST BENCHMARK ---")
+start = time.perf_counter()
+for chunk in stream: ram_only.add_unique(chunk)
+ram_time = time.perf_counter() - start
+
+start = time.perf_counter()
+for chunk in stream: store.add(chunk)
+store_time = time.perf_counter() - start
+start_close = time.perf_counter()
+store.close()
+close_time = time.perf_counter() - start_close
+
+# DiskIndexer opens a file per add, so we time a sample and project
+sample = stream[:20000]
+start = time.perf_counter()
+for chunk in sample: indexer.add(chunk)
+indexer_time = (time.perf_counter() - start) * TOTAL_RECORDS / len(sample)
+
+ram_held = sum(len(l) for l2 in ram_only.buckets.values() for l3 in l2.values() for l in l3.values())
+print(f"RAM Only (3-Layer):  {ram_time:.2f} s  ({TOTAL_RECORDS / ram_time:.0f} rec/s, holds all {ram_held} records in RAM)")
+print(f"Tiered Store:        {store_time:.2f} s  ({TOTAL_RECORDS / store_time:.0f} rec/s) + {close_time:.2f} s final flush/merge")
+print(f"DiskIndexer:         {indexer_time:.2f} s  (projected from {len(sample)} adds)")
+# The flush/merge threads share the GIL (and here one CPU) with the ingest loop, so their
+# work comes straight out of ingest throughput; the set memtable's cheaper adds pay for it
+shortfall = (1 - ram_time / store_time) * 100
+print(f"Ingest Shortfall:    {f'{shortfall:.0f}% below RAM speed' if shortfall > 0 else f'none ({ram_time / store_time:.2f}x RAM speed)'} "
+      f"(background CPU: flush {store.flush_seconds:.2f} s, merge {store.merge_seconds:.2f} s, {store.stalls} back-pressure stalls)")
+print(f"Peak records in RAM: {store.peak_in_memory} (cap {2 * MEMTABLE_RECORDS})")
+print(f"Runs on disk:        {len(store.runs)} (max {MAX_RUNS}), sizes {[run.size for run in store.runs]}")
+
+# --- BENCHMARK: LOOKUP ---
+lookup_list = []
+for _ in range(LOOKUP_COUNT):
+    if random.random() > 0.5:
+        lookup_list.append(random.choice(stream))
+    else:
+        lookup_list.append(os.urandom(RECORD_SIZE))
+
+print(f"\n--- SEARCH BENCHMARK ({LOOKUP_COUNT} Accesses) ---")
+start = time.perf_counter()
+ram_hits = sum(1 for item in lookup_list if ram_only.find(item))
+ram_search = time.perf_counter() - start
+
+start = time.perf_counter()
+store_hits = sum(1 for item in lookup_list if store.find(item))
+store_search = time.perf_counter() - start
+
+print(f"RAM Only (3-Layer):  {ram_search:.4f}s  ({ram_search / LOOKUP_COUNT * 1000:.4f} ms/lookup, hits {ram_hits})")
+print(f"Tiered Store:        {store_search:.4f}s  ({store_search / LOOKUP_COUNT * 1000:.4f} ms/lookup, hits {store_hits})")
@@ -0,0 +1,260 @@
+import time
+import random
+import string
+import collections
+import tracemalloc
+import gc
+import os
+import sys
+import json
+import subprocess
+
+# --- Configuration ---
+DATASET_SIZES = [1000, 10000, 50000]
+KEY_LENGTHS = [6, 16]                 # Characters for string keys, bytes for binary keys
+STANDARD_LIST_MAX = 10000             # StandardList is O(N^2) to build; skip it above this
+SEARCH_COUNT = 1000
+BASELINE_FILE = "memory_baseline.json"
+TOLERANCE = 0.10                      # Fail if total bytes/key grows more than 10% over the baseline
+# Run with --update-baseline to accept the current numbers as the new baseline.
+
+# --- 1. Standard List ---
+class StandardList:
+    def __init__(self):
+        self.data = []
+    def add_unique(self, word):
+        if word not in self.data:
+            self.data.append(word)
+    def find(self, word):
+        return word in self.data
+
+# --- 2. 1-Layer Bucket ---
+class OneLayerList:
+    def __init__(self):
+        self.buckets = collections.defaultdict(list)
+    def add_unique(self, word):
+        c1 = word[0]
+        if word not in self.buckets[c1]:
+            self.buckets[c1].append(word)
+    def find(self, word):
+        c1 = word[0]
+        if c1 in self.buckets:
+            return word in self.buckets[c1]
+        return False
+
+# --- 3. 2-Layer Bucket ---
+class TwoLayerList:
+    def __init__(self):
+        self.buckets = collections.defaultdict(lambda: collections.defaultdict(list))
+    def add_unique(self, word):
+        c1, c2 = word[0], word[1]
+        if word not in self.buckets[c1][c2]:
+            self.buckets[c1][c2].append(word)
+    def find(self, word):
+        c1, c2 = word[0], word[1]
+        if c1 in self.buckets and c2 in self.buckets[c1]:
+            return word in self.buckets[c1][c2]
+        return False
+
+# --- 4. 3-Layer Bucket ---
+class ThreeLayerList:
+    def __init__(self):
+        self.buckets = collections.defaultdict(
+            lambda: collections.defaultdict(
+                lambda: collections.defaultdict(list)
+            )
+        )
+    def add_unique(self, word):
+        c1, c2, c3 = word[0], word[1], word[2]
+        target_list = self.buckets[c1][c2][c3]
+        if word not in target_list:
+            target_list.append(word)
+    def find(self, word):
+        c1, c2, c3 = word[0], word[1], word[2]
+        if (c1 in self.buckets and c2 in self.buckets[c1] and c3 in self.buckets[c1][c2]):
+            return word in self.buckets[c1][c2][c3]
+        return False
+
+# --- 5. 4-Layer Bucket ---
+class FourLayerList:
+    def __init__(self):
+        self.buckets = collections.defaultdict(
+            lambda: collections.defaultdict(
+                lambda: collections.defaultdict(
+                    lambda: collections.defaultdict(list)
+                )
+            )
+        )
+    def add_unique(self, word):
+        c1, c2, c3, c4 = word[0], word[1], word[2], word[3]
+        target_list = self.buckets[c1][c2][c3][c4]
+        if word not in target_list:
+            target_list.append(word)
+    def find(self, word):
+        c1, c2, c3, c4 = word[0], word[1], word[2], word[3]
+        if (c1 in self.buckets and
+            c2 in self.buckets[c1] and
+            c3 in self.buckets[c1][c2] and
+            c4 in self.buckets[c1][c2][c3]):
+            return word in self.buckets[c1][c2][c3][c4]
+        return False
+
+# --- 6. 3-Layer Binary Lookup (Base-256) ---
+class BinaryThreeLayerList:
+    def __init__(self):
+        self.buckets = collections.defaultdict(
+            lambda: collections.defaultdict(
+                lambda: collections.defaultdict(list)
+            )
+        )
+    def add_unique(self, data_chunk):
+        b1, b2, b3 = data_chunk[0], data_chunk[1], data_chunk[2]
+        target_list = self.buckets[b1][b2][b3]
+        if data_chunk not in target_list:
+            target_list.append(data_chunk)
+    def find(self, data_chunk):
+        b1, b2, b3 = data_chunk[0], data_chunk[1], data_chunk[2]
+        if (b1 in self.buckets and b2 in self.buckets[b1] and b3 in self.buckets[b1][b2]):
+            return data_chunk in self.buckets[b1][b2][b3]
+        return False
+
+# --- 7. Python Set (same interface) ---
+class PythonSet:
+    def __init__(self):
+        self.data = set()
+    def add_unique(self, word):
+        self.data.add(word)
+    def find(self, word):
+        return word in self.data
+
+# (name, class, key kind)
+STRUCTURES = [
+    ("StandardList", StandardList, "str"),
+    ("1-Layer", OneLayerList, "str"),
+    ("2-Layer", TwoLayerList, "str"),
+    ("3-Layer", ThreeLayerList, "str"),
+    ("4-Layer", FourLayerList, "str"),
+    ("Set (str)", PythonSet, "str"),
+    ("3-Layer Binary", BinaryThreeLayerList, "bytes"),
+    ("Set (bytes)", PythonSet, "bytes"),
+]
+
+# --- Measurement Helpers ---
+def make_keys(kind, length, count):
+    if kind == "bytes":
+        return [os.urandom(length) for _ in range(count)]
+    return [''.join(random.choices(string.ascii_uppercase, k=length)) for _ in range(count)]
+
+def rss_bytes():
+    # Current resident set size from /proc, or None where that doesn't exist
+    try:
+        with open("/proc/self/statm") as f:
+            return int(f.read().split()[1]) * os.sysconf("SC_PAGE_SIZE")
+    except (OSError, ValueError):
+        return None
+
+def build_rss(name, size, length):
+    # RSS growth of one build, measured in a FRESH interpreter (this script with --rss):
+    # in this process, memory freed by earlier structures gets reused and would read 0 KB,
+    # and tracemalloc's own bookkeeping would be counted as the structure's
+    result = subprocess.run([sys.executable, __file__, "--rss", name, str(size), str(length)],
+                            capture_output=True, text=True)
+    out = result.stdout.strip()
+    return int(out) if out.isdigit() else None
+
+def measure(name, cls, keys, terms):
+    # Keys are created BEFORE tracemalloc starts, so `steady` is what the structure
+    # itself costs on top of the keys (lists, dicts, hash tables). The key objects it
+    # keeps alive are added separately: that part is what changes with key length.
+    key_bytes = sum(sys.getsizeof(key) for key in set(keys))
+    gc.collect()
+    tracemalloc.start()
+    container = cls()
+    for key in keys: container.add_unique(key)
+    steady, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    start = time.perf_counter()
+    for term in terms: container.find(term)
+    search_time = time.perf_counter() - start
+    return steady, key_bytes, peak, build_rss(name, len(keys), len(keys[0])), search_time
+
+# --- RSS CHILD (this script re-run with --rss NAME SIZE LENGTH) ---
+if "--rss" in sys.argv:
+    i = sys.argv.index("--rss")
+    name, size, length = sys.argv[i + 1], int(sys.argv[i + 2]), int(sys.argv[i + 3])
+    cls, kind = next((c, k) for n, c, k in STRUCTURES if n == name)
+    gc.collect()
+    before = rss_bytes()
+    # Keys are made inside the measured window: the structure is what keeps them alive
+    keys = make_keys(kind, length, size)
+    container = cls()
+    for key in keys: container.add_unique(key)
+    del keys
+    gc.collect()
+    after = rss_bytes()
+    print(after - before if before is not None else "n/a")
+    sys.exit(0)
+
+# --- RUN SUITE ---
+update = "--update-baseline" in sys.argv
+baseline = {}
+if not update:
+    if not os.path.exists(BASELINE_FILE):
+        # The baseline is committed; without it there is nothing to check against
+        print(f"FAILED: {BASELINE_FILE} not found. Run with --update-baseline to create it.")
+        sys.exit(1)
+    with open(BASELINE_FILE) as f:
+        baseline = json.load(f)
+
+results = {}
+lookups = {}
+regressions = []
+print(f"--- MEMORY FOOTPRINT SUITE ---")
+print(f"Sizes: {DATASET_SIZES}  Key lengths: {KEY_LENGTHS}  Baseline: {'updating ' + BASELINE_FILE if update else BASELINE_FILE}")
+
+for length in KEY_LENGTHS:
+    for size in DATASET_SIZES:
+        print(f"\n--- {size} keys, length {length} ---")
+        print(f"{'Structure':<16} {'Steady':>10} {'Peak':>10} {'RSS':>10} {'Struct/Key':>10} {'Total/Key':>10} {'Lookup':>9}  Baseline")
+        pools = {kind: make_keys(kind, length, size) for kind in ("str", "bytes")}
+        searches = {kind: make_keys(kind, length, SEARCH_COUNT // 2) + random.sample(pools[kind], min(size, SEARCH_COUNT // 2))
+                    for kind in pools}
+        for name, cls, kind in STRUCTURES:
+            if cls is StandardList and size > STANDARD_LIST_MAX: continue
+            steady, key_bytes, peak, rss, search_time = measure(name, cls, pools[kind], searches[kind])
+            # Gated on the total: structure overhead plus the key objects it holds
+            per_key = (steady + key_bytes) / size
+            key = f"{name}|{size}|{length}"
+            results[key] = per_key
+            lookups[key] = search_time / len(searches[kind])
+            status = ""
+            if key in baseline:
+                change = per_key / baseline[key] - 1
+                status = f"{change * 100:+.1f}%"
+                if change > TOLERANCE:
+                    status += "  REGRESSED"
+                    regressions.append(key)
+            rss_text = f"{rss / 1024:.0f} KB" if rss is not None else "n/a"
+            print(f"{name:<16} {steady / 1024:>7.0f} KB {peak / 1024:>7.0f} KB {rss_text:>10} {steady / size:>10.1f} {per_key:>10.1f} "
+                  f"{lookups[key] * 1e6:>7.2f}us  {status}")
+
+# --- SPEED vs MEMORY CURVE ---
+# One line per structure: what you pay per key for the lookup speed you get, as the data grows
+length = KEY_LENGTHS[0]
+print(f"\n--- SPEED vs MEMORY (key length {length}, total bytes/key @ lookup time) ---")
+for name, cls, kind in STRUCTURES:
+    sizes = [s for s in DATASET_SIZES if not (cls is StandardList and s > STANDARD_LIST_MAX)]
+    curve = "   ".join(f"{s}: {results[f'{name}|{s}|{length}']:5.0f} B @ {lookups[f'{name}|{s}|{length}'] * 1e6:6.2f}us"
+                       for s in sizes)
+    print(f"{name:<16} {curve}")
+
+if update:
+    with open(BASELINE_FILE, "w") as f:
+        json.dump(results, f, indent=2, sort_keys=True)
+    print(f"\nBaseline written to {BASELINE_FILE}")
+elif regressions:
+    print(f"\nFAILED: {len(regressions)} footprint regression(s) over {TOLERANCE * 100:.0f}%:")
+    for key in regressions: print(f"  {key}")
+    sys.exit(1)
+else:
+    print(f"\nPASSED: no footprint regressions over {TOLERANCE * 100:.0f}%")
@@ -0,0 +1,200 @@
+import os
+import time
+import random
+import shutil
+import collections
+from concurrent.futures import ThreadPoolExecutor
+
+# --- Configuration ---
+STORE_ROOT = "my_join_store"
+INCOMING_ROOT = "my_join_incoming"
+RECORD_SIZE = 64
+STORE_RECORDS = 50000
+INCOMING_RECORDS = 100000    # A feed bigger than the store; a quarter of it already exists
+WORKERS = 8                  # Threads for the parallel join (one leading byte per task)
+# Real feeds cluster (IDs, timestamps...). Keys draw their 3-byte prefix from this many
+# hot prefixes, so buckets hold several records. Set to None for uniformly random keys,
+# where almost every bucket holds one record and directory listing dominates the join.
+HOT_PREFIXES = 4096
+
+# --- 1. The Disk Indexer ---
+class DiskIndexer:
+    def __init__(self, root_dir):
+        self.root = root_dir
+        if not os.path.exists(self.root):
+            os.makedirs(self.root)
+
+    def _get_path(self, data_chunk):
+        d1 = f"{data_chunk[0]:02x}"
+        d2 = f"{data_chunk[1]:02x}"
+        d3 = f"{data_chunk[2]:02x}"
+        folder_path = os.path.join(self.root, d1, d2)
+        file_path = os.path.join(folder_path, f"bucket_{d3}.bin")
+        return folder_path, file_path
+
+    def add(self, data_chunk):
+        folder_path, file_path = self._get_path(data_chunk)
+        os.makedirs(folder_path, exist_ok=True)
+        with open(file_path, "ab") as f:
+            f.write(data_chunk)
+
+    def find(self, data_chunk):
+        _, file_path = self._get_path(data_chunk)
+        if not os.path.exists(file_path): return False
+        with open(file_path, "rb") as f:
+            while True:
+                record = f.read(RECORD_SIZE)
+                if not record: break
+                if record == data_chunk: return True
+        return False
+
+# --- 2. Bucket Walking ---
+def _names(path, folders):
+    # Two-digit lowercase hex names sort in the same order as the bytes they stand for
+    if path is None: return []
+    try:
+        names = os.listdir(path)
+    except FileNotFoundError:
+        return []
+    if folders:
+        return sorted(n for n in names if len(n) == 2)
+    return sorted(n for n in names if n.startswith("bucket_") and n.endswith(".bin"))
+
+def _merge_names(names_a, names_b):
+    # Merge-join two sorted name lists: yields (name, in a, in b) in order
+    i = j = 0
+    while i < len(names_a) or j < len(names_b):
+        if j == len(names_b) or (i < len(names_a) and names_a[i] < names_b[j]):
+            yield names_a[i], True, False
+            i += 1
+        elif i == len(names_a) or names_b[j] < names_a[i]:
+            yield names_b[j], False, True
+            j += 1
+        else:
+            yield names_a[i], True, True
+            i += 1
+            j += 1
+
+def _paired_buckets(a, b, leading=None, left_only=True, right_only=True):
+    # Walks BOTH bucket trees together in prefix order, merge-joining at every
+    # folder level, and yields (bucket in a or None, bucket in b or None).
+    # Folders that only one side has are skipped unless left_only/right_only asks for them,
+    # so an intersection never even lists a folder the other index doesn't have.
+    # leading=0..255 restricts the walk to one top-level folder.
+    def wanted(in_a, in_b):
+        return (in_a and in_b) or (in_a and left_only) or (in_b and right_only)
+    def sub(root, name, present):
+        return os.path.join(root, name) if present else None
+    if leading is None:
+        level1 = _merge_names(_names(a.root, True), _names(b.root, True))
+    else:
+        d1 = f"{leading:02x}"
+        level1 = [(d1, os.path.isdir(os.path.join(a.root, d1)), os.path.isdir(os.path.join(b.root, d1)))]
+    for d1, a1, b1 in level1:
+        if not wanted(a1, b1): continue
+        p1a, p1b = sub(a.root, d1, a1), sub(b.root, d1, b1)
+        for d2, a2, b2 in _merge_names(_names(p1a, True), _names(p1b, True)):
+            if not wanted(a2, b2): continue
+            p2a, p2b = sub(p1a, d2, a2), sub(p1b, d2, b2)
+            for name, a3, b3 in _merge_names(_names(p2a, False), _names(p2b, False)):
+                if not wanted(a3, b3): continue
+                yield sub(p2a, name, a3), sub(p2b, name, b3)
+
+def read_bucket(file_path):
+    # One read per bucket; buckets are small
+    with open(file_path, "rb") as f:
+        blob = f.read()
+    return [blob[i:i + RECORD_SIZE] for i in range(0, len(blob), RECORD_SIZE)]
+
+def _unique(records, skip=()):
+    seen = set()
+    for record in records:
+        if record not in seen and record not in skip:
+            seen.add(record)
+            yield record
+
+# --- 3. Set Operations (lazy, prefix order) ---
+def intersection(a, b, leading=None):
+    # Records in both. Buckets only one side has are never opened.
+    for path_a, path_b in _paired_buckets(a, b, leading, left_only=False, right_only=False):
+        in_a = set(read_bucket(path_a))
+        yield from _unique(r for r in read_bucket(path_b) if r in in_a)
+
+def difference(a, b, leading=None):
+    # Records in a that are not in b
+    for path_a, path_b in _paired_buckets(a, b, leading, right_only=False):
+        in_b = set(read_bucket(path_b)) if path_b is not None else ()
+        yield from _unique(read_bucket(path_a), skip=in_b)
+
+def union(a, b, leading=None):
+    for path_a, path_b in _paired_buckets(a, b, leading):
+        records = read_bucket(path_a) if path_a is not None else []
+        if path_b is not None: records += read_bucket(path_b)
+        yield from _unique(records)
+
+def parallel(set_op, a, b, workers=WORKERS):
+    # Splits the job by leading byte (256 independent tasks). Output stays in prefix
+    # order and only `workers * 2` leading bytes are ever buffered at once.
+    with ThreadPoolExecutor(workers) as pool:
+        pending = collections.deque()
+        for leading in range(256):
+            pending.append(pool.submit(lambda lead: list(set_op(a, b, leading=lead)), leading))
+            if len(pending) >= workers * 2:
+                yield from pending.popleft().result()
+        while pending:
+            yield from pending.popleft().result()
+
+def make_record():
+    if HOT_PREFIXES is None:
+        return os.urandom(RECORD_SIZE)
+    return random.choice(prefix_pool) + os.urandom(RECORD_SIZE - 3)
+
+# --- SETUP ---
+print(f"--- BUCKET MERGE-JOIN DEMO ---")
+print(f"Store: {STORE_RECORDS} records  Incoming: {INCOMING_RECORDS} records  ({RECORD_SIZE} bytes each)")
+
+shutil.rmtree(STORE_ROOT, ignore_errors=True)
+shutil.rmtree(INCOMING_ROOT, ignore_errors=True)
+store = DiskIndexer(STORE_ROOT)
+incoming = DiskIndexer(INCOMING_ROOT)
+prefix_pool = [os.urandom(3) for _ in range(HOT_PREFIXES or 0)]
+
+print("\nBuilding both indexes...")
+start_time = time.perf_counter()
+existing = []
+for i in range(STORE_RECORDS):
+    chunk = make_record()
+    if random.random() < 0.5:
+        existing.append(chunk)
+    store.add(chunk)
+incoming_list = existing + [make_record() for _ in range(INCOMING_RECORDS - len(existing))]
+random.shuffle(incoming_list)
+for chunk in incoming_list:
+    incoming.add(chunk)
+print(f"Build Complete. Time: {time.perf_counter() - start_time:.2f}s")
+
+# --- BENCHMARK ---
+print("\n--- \"WHICH INCOMING RECORDS ALREADY EXIST?\" ---")
+
+start = time.perf_counter()
+find_hits = sum(1 for item in incoming_list if store.find(item))
+find_time = time.perf_counter() - start
+print(f"One find() per record:   {find_time:.4f}s  (found {find_hits})")
+
+start = time.perf_counter()
+join_hits = sum(1 for _ in intersection(incoming, store))
+join_time = time.perf_counter() - start
+print(f"Merge-join intersection: {join_time:.4f}s  (found {join_hits})  {find_time / join_time:.1f}x")
+
+start = time.perf_counter()
+parallel_hits = sum(1 for _ in parallel(intersection, incoming, store))
+parallel_time = time.perf_counter() - start
+print(f"Parallel ({WORKERS} workers):    {parallel_time:.4f}s  (found {parallel_hits})  {find_time / parallel_time:.1f}x")
+
+print("\n--- OTHER OPERATIONS ---")
+start = time.perf_counter()
+new_count = sum(1 for _ in difference(incoming, store))
+print(f"difference(incoming, store): {new_count} new records  ({time.perf_counter() - start:.4f}s)")
+start = time.perf_counter()
+union_count = sum(1 for _ in union(incoming, store))
+print(f"union(incoming, store):      {union_count} records  ({time.perf_counter() - start:.4f}s)")
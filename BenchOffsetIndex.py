@@ -0,0 +1,191 @@
+import os
+import time
+import random
+import struct
+import hashlib
+import shutil
+import collections
+
+# --- Configuration ---
+DB_ROOT = "my_offset_index"
+FULL_ROOT = "my_offset_full_copy"
+FLAT_FILE = "offset_flat_file.bin"
+RECORD_SIZE = 65535          # 64KB per record, same as BenchDIsk.py
+TOTAL_RECORDS = 4000         # ~250 MB flat file
+BATCH_SIZE = 256             # Records per read while building from the flat file
+FLUSH_ENTRIES = 100000       # Index entries buffered in RAM before they're appended to buckets
+LOOKUP_COUNT = 20000
+FINGERPRINT_SPAN = 256       # Leading bytes hashed into the fingerprint (hashing all 64KB costs ~160us)
+
+# --- Index Entry ---
+# [8-byte fingerprint][8-byte record number] = 16 bytes per record instead of 64KB
+ENTRY = struct.Struct("<8sQ")
+
+def fingerprint(data_chunk):
+    # Records that share their first FINGERPRINT_SPAN bytes get the same fingerprint.
+    # That only costs an extra pread to tell them apart, never a wrong answer.
+    return hashlib.blake2b(data_chunk[:FINGERPRINT_SPAN], digest_size=8).digest()
+
+# --- 1. The Disk Indexer (Full Copy "Control") ---
+class DiskIndexer:
+    def __init__(self, root_dir):
+        self.root = root_dir
+        if not os.path.exists(self.root):
+            os.makedirs(self.root)
+
+    def _get_path(self, data_chunk):
+        d1 = f"{data_chunk[0]:02x}"
+        d2 = f"{data_chunk[1]:02x}"
+        d3 = f"{data_chunk[2]:02x}"
+        folder_path = os.path.join(self.root, d1, d2)
+        file_path = os.path.join(folder_path, f"bucket_{d3}.bin")
+        return folder_path, file_path
+
+    def add(self, data_chunk):
+        folder_path, file_path = self._get_path(data_chunk)
+        os.makedirs(folder_path, exist_ok=True)
+        with open(file_path, "ab") as f:
+            f.write(data_chunk)
+
+    def find(self, data_chunk):
+        _, file_path = self._get_path(data_chunk)
+        if not os.path.exists(file_path): return False
+        with open(file_path, "rb") as f:
+            while True:
+                record = f.read(RECORD_SIZE)
+                if not record: break
+                if record == data_chunk: return True
+        return False
+
+# --- 2. The Offset Indexer (Secondary Index over the Flat File) ---
+class OffsetIndexer:
+    def __init__(self, root_dir, data_file):
+        # Buckets hold (fingerprint, record number) pairs; the record itself
+        # stays in data_file and is only read back to confirm a match.
+        self.root = root_dir
+        self.data_file = data_file
+        if not os.path.exists(self.root):
+            os.makedirs(self.root)
+        self.data_fd = os.open(data_file, os.O_RDONLY)
+
+    def _get_path(self, data_chunk):
+        d1 = f"{data_chunk[0]:02x}"
+        d2 = f"{data_chunk[1]:02x}"
+        d3 = f"{data_chunk[2]:02x}"
+        folder_path = os.path.join(self.root, d1, d2)
+        file_path = os.path.join(folder_path, f"bucket_{d3}.bin")
+        return folder_path, file_path
+
+    def _append(self, prefix, entries):
+        folder_path, file_path = self._get_path(prefix)
+        os.makedirs(folder_path, exist_ok=True)
+        with open(file_path, "ab") as f:
+            f.write(entries)
+
+    def add(self, data_chunk, record_number):
+        # For records appended to the flat file after the initial build
+        self._append(data_chunk[:3], ENTRY.pack(fingerprint(data_chunk), record_number))
+
+    def build(self):
+        # ONE sequential pass over an existing flat file. Entries are grouped per
+        # bucket in RAM and appended in bulk, so each bucket file is opened once per flush.
+        pending = collections.defaultdict(bytearray)
+        buffered = 0
+        record_number = 0
+        with open(self.data_file, "rb") as f:
+            while True:
+                chunk_batch = f.read(RECORD_SIZE * BATCH_SIZE)
+                if not chunk_batch: break
+                for i in range(0, len(chunk_batch), RECORD_SIZE):
+                    record = chunk_batch[i:i + RECORD_SIZE]
+                    pending[record[:3]] += ENTRY.pack(fingerprint(record), record_number)
+                    record_number += 1
+                    buffered += 1
+                if buffered >= FLUSH_ENTRIES:
+                    for prefix, entries in pending.items(): self._append(prefix, entries)
+                    pending.clear()
+                    buffered = 0
+        for prefix, entries in pending.items(): self._append(prefix, entries)
+        return record_number
+
+    def find(self, data_chunk):
+        _, file_path = self._get_path(data_chunk)
+        if not os.path.exists(file_path): return False
+        with open(file_path, "rb") as f:
+            bucket = f.read()
+        fp = fingerprint(data_chunk)
+        for entry_fp, record_number in ENTRY.iter_unpack(bucket):
+            # Only a fingerprint match costs a read of the real record
+            if entry_fp == fp and os.pread(self.data_fd, RECORD_SIZE, record_number * RECORD_SIZE) == data_chunk:
+                return True
+        return False
+
+    def close(self):
+        os.close(self.data_fd)
+
+# --- Measurement Helper ---
+def disk_bytes(path):
+    if os.path.isfile(path): return os.path.getsize(path)
+    total = 0
+    for folder_path, _, files in os.walk(path):
+        for name in files:
+            total += os.path.getsize(os.path.join(folder_path, name))
+    return total
+
+# --- SETUP ---
+print(f"--- OFFSET-ONLY SECONDARY INDEX DEMO ---")
+print(f"Record Size: {RECORD_SIZE} bytes  Total Records: {TOTAL_RECORDS}")
+print(f"Est. Flat File Size: {TOTAL_RECORDS * RECORD_SIZE / (1024**2):.0f} MB")
+
+shutil.rmtree(DB_ROOT, ignore_errors=True)
+shutil.rmtree(FULL_ROOT, ignore_errors=True)
+known_targets = []
+
+print("\nWriting the flat file (the only copy of the data)...")
+start_time = time.perf_counter()
+with open(FLAT_FILE, "wb") as f_flat:
+    for i in range(TOTAL_RECORDS):
+        chunk = os.urandom(RECORD_SIZE)
+        if len(known_targets) < 100 and random.random() < 0.05:
+            known_targets.append(chunk)
+        f_flat.write(chunk)
+print(f"Flat File Complete. Time: {time.perf_counter() - start_time:.2f}s")
+
+# --- BENCHMARK: BUILD ---
+print("\n--- BUILD BENCHMARK ---")
+start = time.perf_counter()
+full = DiskIndexer(FULL_ROOT)
+with open(FLAT_FILE, "rb") as f:
+    while True:
+        record = f.read(RECORD_SIZE)
+        if not record: break
+        full.add(record)
+full_build = time.perf_counter() - start
+
+start = time.perf_counter()
+offsets = OffsetIndexer(DB_ROOT, FLAT_FILE)
+indexed = offsets.build()
+offset_build = time.perf_counter() - start
+
+flat_size = disk_bytes(FLAT_FILE)
+print(f"Full-copy DiskIndexer:  {full_build:.2f}s  index {disk_bytes(FULL_ROOT) / 1024 / 1024:8.2f} MB  (+ {flat_size / 1024 / 1024:.0f} MB flat file)")
+print(f"Offset-only index:      {offset_build:.2f}s  index {disk_bytes(DB_ROOT) / 1024 / 1024:8.2f} MB  (+ {flat_size / 1024 / 1024:.0f} MB flat file, {indexed} records)")
+
+# --- BENCHMARK: LOOKUP ---
+lookup_list = []
+for _ in range(LOOKUP_COUNT):
+    if random.random() > 0.5:
+        lookup_list.append(random.choice(known_targets))
+    else:
+        lookup_list.append(os.urandom(RECORD_SIZE))
+
+print(f"\n--- SEARCH BENCHMARK ({LOOKUP_COUNT} Accesses) ---")
+start = time.perf_counter()
+full_hits = sum(1 for item in lookup_list if full.find(item))
+full_time = time.perf_counter() - start
+start = time.perf_counter()
+offset_hits = sum(1 for item in lookup_list if offsets.find(item))
+offset_time = time.perf_counter() - start
+print(f"Full-copy DiskIndexer:  {full_time:.4f}s  ({full_time / LOOKUP_COUNT * 1e6:.1f} us/lookup, hits {full_hits})")
+print(f"Offset-only index:      {offset_time:.4f}s  ({offset_time / LOOKUP_COUNT * 1e6:.1f} us/lookup, hits {offset_hits})")
+offsets.close()
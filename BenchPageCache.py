@@ -0,0 +1,223 @@
+import os
+import time
+import random
+import mmap
+import shutil
+import threading
+
+# --- Configuration ---
+DB_ROOT = "my_pagecache_index"
+FLAT_FILE = "pagecache_flat_file.bin"
+RECORD_SIZE = 65535          # 64KB per record, same as BenchDIsk.py
+TOTAL_RECORDS = 4000         # ~250 MB flat file. Make it bigger than RAM to see real eviction.
+BATCH_SIZE = 1024            # Records per read for the normal linear scan (~64MB)
+DIRECT_BLOCK = 4096          # O_DIRECT needs offsets, sizes and buffers aligned to this
+HOT_TARGETS = 100
+PREFETCH_BATCH = 64
+
+HAS_FADVISE = hasattr(os, "posix_fadvise")
+HAS_DIRECT = hasattr(os, "O_DIRECT")
+
+# --- Page Cache Helpers ---
+def drop_from_cache(path):
+    # DONTNEED on a clean file drops its pages from the page cache (no root needed)
+    if not HAS_FADVISE: return
+    fd = os.open(path, os.O_RDONLY)
+    try:
+        os.posix_fadvise(fd, 0, 0, os.POSIX_FADV_DONTNEED)
+    finally:
+        os.close(fd)
+
+def page_cache_mb():
+    # "Cached" from /proc/meminfo, or None where that doesn't exist
+    try:
+        with open("/proc/meminfo") as f:
+            for line in f:
+                if line.startswith("Cached:"):
+                    return int(line.split()[1]) / 1024
+    except OSError:
+        pass
+    return None
+
+# --- 1. The Disk Indexer (with prefetch) ---
+class DiskIndexer:
+    def __init__(self, root_dir):
+        self.root = root_dir
+        if not os.path.exists(self.root):
+            os.makedirs(self.root)
+
+    def _get_path(self, data_chunk):
+        d1 = f"{data_chunk[0]:02x}"
+        d2 = f"{data_chunk[1]:02x}"
+        d3 = f"{data_chunk[2]:02x}"
+        folder_path = os.path.join(self.root, d1, d2)
+        file_path = os.path.join(folder_path, f"bucket_{d3}.bin")
+        return folder_path, file_path
+
+    def add(self, data_chunk):
+        folder_path, file_path = self._get_path(data_chunk)
+        os.makedirs(folder_path, exist_ok=True)
+        with open(file_path, "ab") as f:
+            f.write(data_chunk)
+
+    def find(self, data_chunk):
+        _, file_path = self._get_path(data_chunk)
+        if not os.path.exists(file_path): return False
+        with open(file_path, "rb") as f:
+            while True:
+                record = f.read(RECORD_SIZE)
+                if not record: break
+                if record == data_chunk: return True
+        return False
+
+    def prefetch(self, data_chunks):
+        # WILLNEED for a batch of known upcoming lookups: the kernel starts reading
+        # all their buckets now, in parallel, instead of one blocking read per find()
+        if not HAS_FADVISE: return
+        for data_chunk in data_chunks:
+            _, file_path = self._get_path(data_chunk)
+            try:
+                fd = os.open(file_path, os.O_RDONLY)
+            except FileNotFoundError:
+                continue
+            try:
+                os.posix_fadvise(fd, 0, 0, os.POSIX_FADV_WILLNEED)
+            finally:
+                os.close(fd)
+
+    def evict(self, data_chunks):
+        # Benchmark helper: make these buckets cold again
+        for data_chunk in data_chunks:
+            _, file_path = self._get_path(data_chunk)
+            if os.path.exists(file_path): drop_from_cache(file_path)
+
+# --- 2. The Linear Scan, with an I/O Policy ---
+def linear_disk_search_batched(target, all_data_file, policy="cache"):
+    # policy="cache"    - plain buffered reads (the original behaviour)
+    # policy="dontneed" - SEQUENTIAL read-ahead, and each batch is dropped from the
+    #                     page cache right after we've searched it
+    # policy="direct"   - O_DIRECT: bypasses the page cache entirely
+    if policy == "direct" and HAS_DIRECT:
+        try:
+            return _direct_search(target, all_data_file)
+        except OSError:
+            # Filesystem refused O_DIRECT (tmpfs, some overlays): next best thing
+            policy = "dontneed"
+    if policy == "dontneed" and not HAS_FADVISE:
+        policy = "cache"
+    with open(all_data_file, "rb") as f:
+        if policy == "dontneed":
+            os.posix_fadvise(f.fileno(), 0, 0, os.POSIX_FADV_SEQUENTIAL)
+        offset = 0
+        while True:
+            chunk_batch = f.read(RECORD_SIZE * BATCH_SIZE)
+            if not chunk_batch: break
+            if policy == "dontneed":
+                os.posix_fadvise(f.fileno(), offset, len(chunk_batch), os.POSIX_FADV_DONTNEED)
+            offset += len(chunk_batch)
+            if target in chunk_batch:
+                return True
+    return False
+
+def _direct_search(target, all_data_file):
+    # Reads straight into an anonymous mmap, which is page-aligned as O_DIRECT requires.
+    # Batches are block-aligned rather than record-aligned, so we keep the last
+    # len(target) - 1 bytes of each batch to catch a record split across two batches.
+    size = (RECORD_SIZE * BATCH_SIZE // DIRECT_BLOCK) * DIRECT_BLOCK
+    buf = mmap.mmap(-1, size)
+    fd = os.open(all_data_file, os.O_RDONLY | os.O_DIRECT)
+    try:
+        carry = b""
+        offset = 0
+        while True:
+            n = os.preadv(fd, [buf], offset)
+            if n == 0: break
+            window = carry + buf[:n]
+            if target in window:
+                return True
+            carry = window[-(len(target) - 1):]
+            offset += n
+            if n < size: break
+    finally:
+        os.close(fd)
+        buf.close()
+    return False
+
+# --- Measurement Helpers ---
+def percentile(values, p):
+    values = sorted(values)
+    return values[min(len(values) - 1, int(len(values) * p / 100))]
+
+def lookups_during_scan(indexer, lookup_list, target, policy):
+    # Runs a full scan in the background and times every find() while it runs
+    scan_time = [0.0]
+    def scan():
+        start = time.perf_counter()
+        linear_disk_search_batched(target, FLAT_FILE, policy)
+        scan_time[0] = time.perf_counter() - start
+    scanner = threading.Thread(target=scan)
+    latencies = []
+    scanner.start()
+    while scanner.is_alive() or not latencies:
+        for item in lookup_list:
+            start = time.perf_counter()
+            indexer.find(item)
+            latencies.append(time.perf_counter() - start)
+    scanner.join()
+    return scan_time[0], latencies
+
+# --- SETUP ---
+print(f"--- PAGE CACHE AWARE I/O DEMO ---")
+print(f"Record Size: {RECORD_SIZE} bytes  Total Records: {TOTAL_RECORDS}")
+print(f"Est. Flat File Size: {TOTAL_RECORDS * RECORD_SIZE / (1024**2):.0f} MB")
+print(f"posix_fadvise: {HAS_FADVISE}  O_DIRECT: {HAS_DIRECT}")
+
+shutil.rmtree(DB_ROOT, ignore_errors=True)
+indexer = DiskIndexer(DB_ROOT)
+known_targets = []
+
+print("\nStarting Stream: Generate -> Index -> Write Flat File...")
+start_time = time.perf_counter()
+with open(FLAT_FILE, "wb") as f_flat:
+    for i in range(TOTAL_RECORDS):
+        chunk = os.urandom(RECORD_SIZE)
+        if len(known_targets) < HOT_TARGETS and random.random() < 0.05:
+            known_targets.append(chunk)
+        f_flat.write(chunk)
+        indexer.add(chunk)
+print(f"Generation Complete. Time: {time.perf_counter() - start_time:.2f}s")
+os.sync()
+
+missing = os.urandom(RECORD_SIZE)   # Not in the file, so every scan reads all of it
+
+# --- BENCHMARK: SCANS SIDE BY SIDE WITH LOOKUPS ---
+print(f"\n--- SCAN + LOOKUPS SIDE BY SIDE ---")
+print(f"{'Policy':<10} {'Scan':>9} {'Cache Growth':>13} {'Lookup p50':>11} {'Lookup p99':>11}")
+for policy in ("cache", "dontneed", "direct"):
+    drop_from_cache(FLAT_FILE)
+    for item in known_targets: indexer.find(item)    # Warm the hot buckets
+    before = page_cache_mb()
+    scan_time, latencies = lookups_during_scan(indexer, known_targets, missing, policy)
+    after = page_cache_mb()
+    growth = f"{after - before:.0f} MB" if before is not None else "n/a"
+    print(f"{policy:<10} {scan_time:>8.2f}s {growth:>13} {percentile(latencies, 50) * 1e6:>9.0f}us {percentile(latencies, 99) * 1e6:>9.0f}us")
+
+# --- BENCHMARK: WILLNEED PREFETCH ---
+print(f"\n--- PREFETCH BENCHMARK (batches of {PREFETCH_BATCH} cold lookups) ---")
+batches = [known_targets[i:i + PREFETCH_BATCH] for i in range(0, len(known_targets), PREFETCH_BATCH)]
+
+indexer.evict(known_targets)
+start = time.perf_counter()
+for batch in batches:
+    for item in batch: indexer.find(item)
+cold_time = time.perf_counter() - start
+
+indexer.evict(known_targets)
+start = time.perf_counter()
+for batch in batches:
+    indexer.prefetch(batch)
+    for item in batch: indexer.find(item)
+prefetch_time = time.perf_counter() - start
+
+print(f"Cold find():          {cold_time:.4f}s  ({cold_time / len(known_targets) * 1e6:.0f} us/lookup)")
+print(f"prefetch() + find():  {prefetch_time:.4f}s  ({prefetch_time / len(known_targets) * 1e6:.0f} us/lookup)")
@@ -0,0 +1,318 @@
+import os
+import sys
+import array
+import time
+import random
+import collections
+import struct
+import mmap
+import multiprocessing
+import gc
+from multiprocessing import shared_memory
+
+# --- Configuration ---
+KEY_SIZE = 16                # Fixed-size binary keys, like BenchBinary.py
+TOTAL_KEYS = 200000
+WORKERS = 4
+LOOKUPS_PER_WORKER = 20000
+KEYS_FILE = "shared_keys.bin"        # Where a "build it yourself" worker loads keys from
+INDEX_FILE = "shared_index.lkt"      # The memory-mapped file version of the flat index
+
+# --- Flat Layout ---
+# Fixed-size keys:    [header][directory: 65537 x uint32][keys: count x key_size, sorted]
+# Variable-size keys: [header][directory][offsets: (count + 1) x uint32][keys, sorted, back to back]
+# The directory is a 2-byte prefix table: keys starting with prefix p live at
+# positions directory[p] .. directory[p + 1]. Key i of a variable-size index is
+# bytes offsets[i] .. offsets[i + 1] of the key area (so up to 4 GB of keys).
+# No pointers anywhere, so the same bytes work at any address, in any process.
+# Every integer is little-endian, whatever machine wrote or reads it.
+MAGIC = b"LKT2"
+HEADER = struct.Struct("<4sIIQ")     # magic, key size (0 = variable), flags, key count
+FLAG_TEXT = 1                        # Keys were str (ThreeLayerList words), stored as UTF-8
+DIR_ENTRIES = 65536 + 1
+DIR_OFFSET = HEADER.size
+TABLE_OFFSET = DIR_OFFSET + DIR_ENTRIES * 4   # Offsets (variable) or keys (fixed) start here
+
+def layout_size(sorted_keys, key_size):
+    if key_size:
+        return TABLE_OFFSET + len(sorted_keys) * key_size
+    return TABLE_OFFSET + (len(sorted_keys) + 1) * 4 + sum(map(len, sorted_keys))
+
+def bucket_of(key):
+    # Keys shorter than 2 bytes sort before every longer key sharing their bytes,
+    # so padding them with zero keeps each bucket a contiguous run
+    return (key[0] << 8 if key else 0) | (key[1] if len(key) > 1 else 0)
+
+def prepare_keys(keys, key_size):
+    # -> (sorted unique byte keys, flags). key_size=0 takes keys of any length, str included.
+    keys = set(keys)
+    flags = 0
+    if any(isinstance(key, str) for key in keys):
+        keys = {key.encode() for key in keys}    # UTF-8 byte order == code point order
+        flags |= FLAG_TEXT
+    if key_size and any(len(key) != key_size for key in keys):
+        raise ValueError(f"every key must be {key_size} bytes; use key_size=0 for variable-length keys")
+    return sorted(keys), flags
+
+def write_layout(sorted_keys, key_size, flags, buf):
+    HEADER.pack_into(buf, 0, MAGIC, key_size, flags, len(sorted_keys))
+    counts = [0] * 65536
+    for key in sorted_keys:
+        counts[bucket_of(key)] += 1
+    directory = [0] * DIR_ENTRIES
+    for p in range(65536):
+        directory[p + 1] = directory[p] + counts[p]
+    struct.pack_into(f"<{DIR_ENTRIES}I", buf, DIR_OFFSET, *directory)
+    keys_offset = TABLE_OFFSET
+    if not key_size:
+        offsets = [0] * (len(sorted_keys) + 1)
+        for i, key in enumerate(sorted_keys):
+            offsets[i + 1] = offsets[i] + len(key)
+        struct.pack_into(f"<{len(offsets)}I", buf, TABLE_OFFSET, *offsets)
+        keys_offset += len(offsets) * 4
+    blob = b"".join(sorted_keys)
+    buf[keys_offset:keys_offset + len(blob)] = blob
+
+def uint32_table(view):
+    # Little-endian hosts read the table in place; anywhere else it is swapped into a copy
+    if sys.byteorder == "little":
+        return view.cast("I")
+    table = array.array("I", view.tobytes())
+    table.byteswap()
+    return table
+
+# --- 1. 3-Layer Binary Lookup (Per-Process "Control") ---
+class BinaryThreeLayerList:
+    def __init__(self):
+        self.buckets = collections.defaultdict(
+            lambda: collections.defaultdict(
+                lambda: collections.defaultdict(list)
+            )
+        )
+    def add_unique(self, data_chunk):
+        b1, b2, b3 = data_chunk[0], data_chunk[1], data_chunk[2]
+        target_list = self.buckets[b1][b2][b3]
+        if data_chunk not in target_list:
+            target_list.append(data_chunk)
+    def find(self, data_chunk):
+        b1, b2, b3 = data_chunk[0], data_chunk[1], data_chunk[2]
+        if (b1 in self.buckets and b2 in self.buckets[b1] and b3 in self.buckets[b1][b2]):
+            return data_chunk in self.buckets[b1][b2][b3]
+        return False
+
+# --- 2. Flat Read-Only Index (shared memory or mmap) ---
+class FlatIndex:
+    def __init__(self, buf, owner=None):
+        # buf: any buffer holding the flat layout. Nothing is copied out of it.
+        self.owner = owner           # SharedMemory / mmap that must outlive the views
+        self.buf = memoryview(buf)
+        magic, self.key_size, flags, self.count = HEADER.unpack_from(self.buf, 0)
+        if magic != MAGIC:
+            raise ValueError("not a flat lookup index")
+        self.text = bool(flags & FLAG_TEXT)
+        self.directory = uint32_table(self.buf[DIR_OFFSET:TABLE_OFFSET])
+        if self.key_size:
+            self.offsets = None
+            keys_offset = TABLE_OFFSET
+            keys_size = self.count * self.key_size
+        else:
+            keys_offset = TABLE_OFFSET + (self.count + 1) * 4
+            self.offsets = uint32_table(self.buf[TABLE_OFFSET:keys_offset])
+            keys_size = self.offsets[self.count]
+            self._key = self._variable_key
+        self.keys = self.buf[keys_offset:keys_offset + keys_size]
+        self.size = keys_offset + keys_size
+
+    @classmethod
+    def publish(cls, keys, key_size=KEY_SIZE, name=None):
+        # Build ONCE into a named shared memory block that other processes attach to
+        sorted_keys, flags = prepare_keys(keys, key_size)
+        shm = shared_memory.SharedMemory(name=name, create=True, size=layout_size(sorted_keys, key_size))
+        write_layout(sorted_keys, key_size, flags, shm.buf)
+        return cls(shm.buf, owner=shm)
+
+    @classmethod
+    def attach(cls, name):
+        try:
+            shm = shared_memory.SharedMemory(name=name, track=False)   # Python 3.13+
+        except TypeError:
+            shm = shared_memory.SharedMemory(name=name)
+            if multiprocessing.parent_process() is None:
+                # Older Pythons: an unrelated process has its own resource tracker, which
+                # would unlink the block when THIS process exits. Only the publisher should.
+                # (Our own child processes share the publisher's tracker, so they skip this.)
+                from multiprocessing import resource_tracker
+                resource_tracker.unregister(shm._name, "shared_memory")
+        return cls(shm.buf, owner=shm)
+
+    @classmethod
+    def publish_file(cls, keys, path, key_size=KEY_SIZE):
+        sorted_keys, flags = prepare_keys(keys, key_size)
+        buf = bytearray(layout_size(sorted_keys, key_size))
+        write_layout(sorted_keys, key_size, flags, buf)
+        with open(path, "wb") as f:
+            f.write(buf)
+
+    @classmethod
+    def open_file(cls, path):
+        with open(path, "rb") as f:
+            mm = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+        return cls(mm, owner=mm)
+
+    @property
+    def name(self):
+        return self.owner.name
+
+    def _range(self, prefix):
+        # Directory narrows to the 2-byte bucket; prefixes shorter than that span several
+        if len(prefix) >= 2:
+            p = prefix[0] << 8 | prefix[1]
+            return self.directory[p], self.directory[p + 1]
+        if len(prefix) == 1:
+            return self.directory[prefix[0] << 8], self.directory[(prefix[0] + 1) << 8]
+        return 0, self.count
+
+    def _key(self, i):
+        return self.keys[i * self.key_size:(i + 1) * self.key_size]
+
+    def _variable_key(self, i):
+        return self.keys[self.offsets[i]:self.offsets[i + 1]]
+
+    def _lower_bound(self, lo, hi, target):
+        while lo < hi:
+            mid = (lo + hi) // 2
+            if self._key(mid).tobytes() < target: lo = mid + 1
+            else: hi = mid
+        return lo
+
+    def find(self, data_chunk):
+        if isinstance(data_chunk, str): data_chunk = data_chunk.encode()
+        lo, hi = self._range(data_chunk)
+        i = self._lower_bound(lo, hi, data_chunk)
+        return i < hi and self._key(i) == data_chunk
+
+    def prefix(self, prefix):
+        # Yields every key starting with prefix, in sorted order (str for a text index)
+        if isinstance(prefix, str): prefix = prefix.encode()
+        lo, hi = self._range(prefix)
+        for i in range(self._lower_bound(lo, hi, prefix), hi):
+            key = self._key(i).tobytes()
+            if not key.startswith(prefix): break
+            yield key.decode() if self.text else key
+
+    def close(self):
+        # Views must be released before the block/mmap under them can close
+        for table in (self.directory, self.offsets):
+            if isinstance(table, memoryview): table.release()
+        self.keys.release()
+        self.buf.release()
+        self.owner.close()
+
+    def unlink(self):
+        self.owner.unlink()
+
+# --- Worker Helpers ---
+def private_kb():
+    # Memory only THIS process owns (not shared with the parent or other workers)
+    try:
+        with open("/proc/self/smaps_rollup") as f:
+            return sum(int(line.split()[1]) for line in f if line.startswith(("Private_Clean", "Private_Dirty")))
+    except OSError:
+        return 0
+
+def iter_keys(blob):
+    # Lookups travel as ONE bytes object: touching thousands of inherited small objects
+    # would copy-on-write their pages and hide what the index itself costs
+    for i in range(0, len(blob), KEY_SIZE):
+        yield blob[i:i + KEY_SIZE]
+
+def worker_build(lookups, results):
+    # What each pre-fork worker does today: load and build its own copy
+    before = private_kb()
+    start = time.perf_counter()
+    index = BinaryThreeLayerList()
+    with open(KEYS_FILE, "rb") as f:
+        blob = f.read()
+    for item in iter_keys(blob):
+        index.add_unique(item)
+    del blob
+    ready = time.perf_counter() - start
+    start = time.perf_counter()
+    hits = sum(1 for item in iter_keys(lookups) if index.find(item))
+    results.put((ready, time.perf_counter() - start, hits, private_kb() - before))
+
+def worker_attach(name, lookups, results):
+    before = private_kb()
+    start = time.perf_counter()
+    index = FlatIndex.attach(name) if name else FlatIndex.open_file(INDEX_FILE)
+    ready = time.perf_counter() - start
+    start = time.perf_counter()
+    hits = sum(1 for item in iter_keys(lookups) if index.find(item))
+    lookup_time = time.perf_counter() - start
+    results.put((ready, lookup_time, hits, private_kb() - before))
+    index.close()
+
+def run_workers(target, args, lookups):
+    results = multiprocessing.Queue()
+    procs = [multiprocessing.Process(target=target, args=args + (lookups, results)) for _ in range(WORKERS)]
+    for p in procs: p.start()
+    out = [results.get() for _ in procs]
+    for p in procs: p.join()
+    return out
+
+def report(label, rows):
+    ready = max(r[0] for r in rows)
+    lookup = sum(r[1] for r in rows) / len(rows)
+    hits = rows[0][2]
+    private = sum(r[3] for r in rows)
+    print(f"{label:<22} ready {ready:7.3f}s  lookups {lookup:.3f}s  hits {hits}  private RAM {private / 1024:8.1f} MB total")
+
+# --- SETUP ---
+if __name__ == "__main__":
+    print(f"--- SHARED READ-ONLY INDEX DEMO ---")
+    print(f"Keys: {TOTAL_KEYS} x {KEY_SIZE} bytes  Workers: {WORKERS}")
+
+    keys = [os.urandom(KEY_SIZE) for _ in range(TOTAL_KEYS)]
+    lookup_list = random.sample(keys, LOOKUPS_PER_WORKER // 2) + [os.urandom(KEY_SIZE) for _ in range(LOOKUPS_PER_WORKER // 2)]
+    lookups = b"".join(lookup_list)
+    with open(KEYS_FILE, "wb") as f:
+        f.write(b"".join(keys))
+
+    start = time.perf_counter()
+    shared = FlatIndex.publish(keys)
+    print(f"Published to shared memory '{shared.name}' in {time.perf_counter() - start:.3f}s "
+          f"({shared.size / 1024 / 1024:.2f} MB, once)")
+    start = time.perf_counter()
+    FlatIndex.publish_file(keys, INDEX_FILE)
+    print(f"Published to {INDEX_FILE} in {time.perf_counter() - start:.3f}s")
+    del keys
+
+    # Prefix query sanity check against the published block
+    probe = lookup_list[0][:3]
+    print(f"Keys starting with {probe.hex()}: {sum(1 for _ in shared.prefix(probe))}")
+
+    # Variable-length text keys, as a ThreeLayerList holds them (key_size=0 adds the offsets array)
+    words = ["".join(random.choice("ABCDEFGHIJKLMNOPQRSTUVWXYZ") for _ in range(random.randint(1, 12))) for _ in range(20000)]
+    text = FlatIndex.publish(words, key_size=0)
+    misses = ["".join(random.choice("abcdefghijklmnopqrstuvwxyz") for _ in range(8)) for _ in range(1000)]
+    print(f"Text index: {text.count} words, {text.size / 1024:.0f} KB, "
+          f"finds {sum(1 for word in words[:1000] if text.find(word))}/1000 known, "
+          f"{sum(1 for word in misses if text.find(word))}/1000 unknown, "
+          f"prefix 'AB' {sum(1 for _ in text.prefix('AB'))} (expected {len({w for w in words if w.startswith('AB')})})")
+    text.close()
+    text.unlink()
+
+    # Like a pre-fork server: freeze the parent's objects so the workers' garbage
+    # collector doesn't write to (and so privately copy) every inherited page
+    gc.collect()
+    gc.freeze()
+
+    print(f"\n--- {WORKERS} WORKERS, {LOOKUPS_PER_WORKER} LOOKUPS EACH ---")
+    report("Build per worker", run_workers(worker_build, (), lookups))
+    report("Attach shared memory", run_workers(worker_attach, (shared.name,), lookups))
+    report("Attach mmap file", run_workers(worker_attach, (None,), lookups))
+
+    shared.close()
+    shared.unlink()
+    os.remove(KEYS_FILE)
+    os.remove(INDEX_FILE)
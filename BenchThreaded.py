@@ -0,0 +1,158 @@
+import time
+import random
+import string
+import collections
+import threading
+import sys
+
+# --- Configuration ---
+THREAD_COUNTS = [1, 2, 4, 8]
+OPS_PER_RUN = 200000     # Split evenly across the threads of each run
+STRIPES = 64             # Lock stripes for the concurrent version
+
+# --- 1. 3-Layer Bucket (Not thread-safe, the "Control") ---
+class ThreeLayerList:
+    def __init__(self):
+        self.buckets = collections.defaultdict(
+            lambda: collections.defaultdict(
+                lambda: collections.defaultdict(list)
+            )
+        )
+    def add_unique(self, word):
+        c1, c2, c3 = word[0], word[1], word[2]
+        target_list = self.buckets[c1][c2][c3]
+        # RACE: two threads can both pass this check and both append
+        if word not in target_list:
+            target_list.append(word)
+    def find(self, word):
+        c1, c2, c3 = word[0], word[1], word[2]
+        if (c1 in self.buckets and c2 in self.buckets[c1] and c3 in self.buckets[c1][c2]):
+            return word in self.buckets[c1][c2][c3]
+        return False
+
+# --- 2. 3-Layer Bucket with ONE Global Lock ---
+class GlobalLockThreeLayerList:
+    def __init__(self):
+        self.lock = threading.Lock()
+        self.buckets = collections.defaultdict(
+            lambda: collections.defaultdict(
+                lambda: collections.defaultdict(list)
+            )
+        )
+    def add_unique(self, word):
+        c1, c2, c3 = word[0], word[1], word[2]
+        with self.lock:
+            target_list = self.buckets[c1][c2][c3]
+            if word not in target_list:
+                target_list.append(word)
+    def find(self, word):
+        c1, c2, c3 = word[0], word[1], word[2]
+        with self.lock:
+            if (c1 in self.buckets and c2 in self.buckets[c1] and c3 in self.buckets[c1][c2]):
+                return word in self.buckets[c1][c2][c3]
+            return False
+
+# --- 3. Concurrent 3-Layer Bucket (Striped Locks + Copy-On-Write Buckets) ---
+class ConcurrentThreeLayerList:
+    def __init__(self, stripes=STRIPES):
+        # Writers lock only the stripe that owns the top-level bucket (first char/byte),
+        # so writers on different top-level buckets run in parallel.
+        # Buckets are immutable tuples that get REPLACED, never edited, so readers
+        # never take a lock: they always see either the old or the new tuple.
+        # Plain dicts only - no defaultdict auto-creation behind a reader's back.
+        self.locks = [threading.Lock() for _ in range(stripes)]
+        self.buckets = {}
+
+    def _lock_for(self, c1):
+        return self.locks[hash(c1) % len(self.locks)]
+
+    def add_unique(self, word):
+        c1, c2, c3 = word[0], word[1], word[2]
+        with self._lock_for(c1):
+            # Everything under buckets[c1] is only ever written while holding this lock
+            level2 = self.buckets.get(c1)
+            if level2 is None:
+                level2 = self.buckets.setdefault(c1, {})
+            level3 = level2.get(c2)
+            if level3 is None:
+                level3 = level2.setdefault(c2, {})
+            target = level3.get(c3, ())
+            if word in target: return False
+            level3[c3] = target + (word,)
+            return True
+
+    def find(self, word):
+        level2 = self.buckets.get(word[0])
+        if level2 is None: return False
+        level3 = level2.get(word[1])
+        if level3 is None: return False
+        return word in level3.get(word[2], ())
+
+# --- Benchmark Helper ---
+def run_threads(container, thread_count, inserts, lookups):
+    # Every thread gets its own slice of inserts and lookups; a barrier starts them together
+    barrier = threading.Barrier(thread_count + 1)
+    def worker(my_inserts, my_lookups):
+        barrier.wait()
+        for item in my_inserts: container.add_unique(item)
+        for item in my_lookups: container.find(item)
+    threads = [
+        threading.Thread(target=worker, args=(inserts[i::thread_count], lookups[i::thread_count]))
+        for i in range(thread_count)
+    ]
+    for t in threads: t.start()
+    barrier.wait()
+    start = time.perf_counter()
+    for t in threads: t.join()
+    return time.perf_counter() - start
+
+def count_duplicates(container):
+    total = 0
+    for level2 in container.buckets.values():
+        for level3 in level2.values():
+            for target in level3.values():
+                total += len(target) - len(set(target))
+    return total
+
+# --- Setup Data ---
+gil = getattr(sys, "_is_gil_enabled", lambda: True)()
+print(f"Python {sys.version.split()[0]}  GIL enabled: {gil}")
+if gil:
+    print("(With the GIL only one thread runs Python at a time - run on a free-threaded build to see scaling.)")
+
+print(f"Generating {OPS_PER_RUN} words...")
+inserts = [''.join(random.choices(string.ascii_uppercase, k=6)) for _ in range(OPS_PER_RUN // 2)]
+lookups = [''.join(random.choices(string.ascii_uppercase, k=6)) for _ in range(OPS_PER_RUN // 4)] + random.sample(inserts, OPS_PER_RUN // 4)
+random.shuffle(lookups)
+
+# --- BENCHMARK: SCALING ---
+print(f"\n--- SCALING BENCHMARK ({len(inserts)} inserts + {len(lookups)} lookups per run) ---")
+print(f"{'Threads':>7}  {'Global Lock':>14}  {'Striped/COW':>14}  {'Striped Speedup':>15}")
+base_striped = None
+for thread_count in THREAD_COUNTS:
+    global_time = run_threads(GlobalLockThreeLayerList(), thread_count, inserts, lookups)
+    striped_time = run_threads(ConcurrentThreeLayerList(), thread_count, inserts, lookups)
+    if base_striped is None:
+        base_striped = striped_time
+    global_ops = OPS_PER_RUN / global_time
+    striped_ops = OPS_PER_RUN / striped_time
+    print(f"{thread_count:>7}  {global_ops:>10.0f} op/s  {striped_ops:>10.0f} op/s  {base_striped / striped_time:>14.2f}x")
+
+# --- CORRECTNESS: RACING WRITERS ---
+# Every thread inserts the SAME words, so every add_unique races with another one.
+print("\n--- RACE TEST (8 threads inserting the same 20,000 words) ---")
+same_words = inserts[:20000]
+# Switch threads as often as the interpreter allows, so the threads interleave as tightly as they can
+default_interval = sys.getswitchinterval()
+sys.setswitchinterval(1e-6)
+for name, container in (("3-Layer (no lock)", ThreeLayerList()),
+                        ("Global Lock", GlobalLockThreeLayerList()),
+                        ("Striped/COW", ConcurrentThreeLayerList())):
+    # Each word repeated 8 times in a row, so every thread's [i::8] slice is the full list
+    run_threads(container, 8, [w for w in same_words for _ in range(8)], [])
+    print(f"{name:<18} duplicates: {count_duplicates(container)}")
+sys.setswitchinterval(default_interval)
+if gil:
+    # The GIL only changes hands at a loop jump or a Python function call, and there is
+    # neither between the unlocked check and its append(), so 0 proves nothing here
+    print("(With the GIL the unlocked check-then-append cannot interleave - its 0 is only meaningful on a free-threaded build.)")
@@ -0,0 +1,206 @@
+import time
+import random
+import string
+import collections
+import heapq
+import itertools
+
+# --- 1. 3-Layer Bucket (The "Control") ---
+class ThreeLayerList:
+    def __init__(self):
+        self.buckets = collections.defaultdict(
+            lambda: collections.defaultdict(
+                lambda: collections.defaultdict(list)
+            )
+        )
+    def add_unique(self, word):
+        c1, c2, c3 = word[0], word[1], word[2]
+        target_list = self.buckets[c1][c2][c3]
+        if word not in target_list:
+            target_list.append(word)
+    def find(self, word):
+        c1, c2, c3 = word[0], word[1], word[2]
+        if (c1 in self.buckets and c2 in self.buckets[c1] and c3 in self.buckets[c1][c2]):
+            return word in self.buckets[c1][c2][c3]
+        return False
+
+def bucket_complete(layered, weights, prefix, k):
+    # Autocomplete the "old way": fan out over every bucket the prefix can reach,
+    # collect every match, then pick the best k by weight. Cost grows with the number of matches.
+    level1 = [layered.buckets.get(prefix[0])] if len(prefix) >= 1 else list(layered.buckets.values())
+    level1 = [b for b in level1 if b]
+    level2 = []
+    for b1 in level1:
+        if len(prefix) >= 2:
+            if prefix[1] in b1: level2.append(b1[prefix[1]])
+        else:
+            level2.extend(b1.values())
+    matches = []
+    for b2 in level2:
+        if len(prefix) >= 3:
+            lists = [b2[prefix[2]]] if prefix[2] in b2 else []
+        else:
+            lists = b2.values()
+        for target_list in lists:
+            matches.extend(w for w in target_list if w.startswith(prefix))
+    return [w for _, w in heapq.nlargest(k, ((weights[w], w) for w in matches))]
+
+# --- 2. Path-Compressed (Radix) Trie with Cached Top-K ---
+class RadixNode:
+    __slots__ = ("label", "children", "word", "weight", "top")
+    def __init__(self, label=""):
+        self.label = label     # The run of characters on the edge INTO this node
+        self.children = {}     # First character of child label -> child node
+        self.word = None       # Set when a key ends exactly here
+        self.weight = None
+        self.top = []          # Best (weight, word) pairs anywhere under this node, best first
+
+class RadixTrie:
+    def __init__(self, top_k=10):
+        self.top_k = top_k
+        self.root = RadixNode()
+
+    def _refresh(self, node):
+        # Rebuild this node's cache from its own key and its children's caches (at most 26*k items)
+        candidates = itertools.chain.from_iterable(child.top for child in node.children.values())
+        if node.word is not None:
+            candidates = itertools.chain(candidates, [(node.weight, node.word)])
+        node.top = heapq.nlargest(self.top_k, candidates)
+
+    def insert(self, word, weight=1):
+        # Adds the word, or updates its weight if it is already there
+        node = self.root
+        path = [node]
+        rest = word
+        while rest:
+            child = node.children.get(rest[0])
+            if child is None:
+                child = RadixNode(rest)
+                node.children[rest[0]] = child
+                path.append(child)
+                node = child
+                break
+            label = child.label
+            common = 0
+            limit = min(len(label), len(rest))
+            while common < limit and label[common] == rest[common]:
+                common += 1
+            if common < len(label):
+                # Split the edge: "ABC" -> "AB" -> "C" so the new word can branch off
+                mid = RadixNode(label[:common])
+                child.label = label[common:]
+                mid.children[child.label[0]] = child
+                mid.top = list(child.top)
+                node.children[rest[0]] = mid
+                child = mid
+            path.append(child)
+            node = child
+            rest = rest[common:]
+        old = (node.weight, word) if node.word is not None else None
+        entry = (weight, word)
+        node.word = word
+        node.weight = weight
+        # Only the nodes on this word's path can see their top-k change
+        for n in reversed(path):
+            if old is not None and old in n.top:
+                if weight < old[0]:
+                    # Weight went down: someone else may now deserve the slot
+                    self._refresh(n)
+                    continue
+                n.top.remove(old)
+            elif len(n.top) >= self.top_k and entry <= n.top[-1]:
+                continue
+            n.top.append(entry)
+            n.top.sort(reverse=True)
+            del n.top[self.top_k:]
+
+    def _locate(self, prefix):
+        # Returns the highest node whose keys all start with prefix, or None
+        node = self.root
+        rest = prefix
+        while rest:
+            child = node.children.get(rest[0])
+            if child is None: return None
+            label = child.label
+            if len(rest) <= len(label):
+                return child if label.startswith(rest) else None
+            if not rest.startswith(label): return None
+            rest = rest[len(label):]
+            node = child
+        return node
+
+    def find(self, word):
+        node = self._locate(word)
+        return node is not None and node.word == word
+
+    def complete(self, prefix, k=5):
+        # O(len(prefix)) walk + O(k) copy, no matter how many keys share the prefix
+        node = self._locate(prefix)
+        if node is None: return []
+        if k <= self.top_k:
+            return [w for _, w in node.top[:k]]
+        # Asked for more than we cache: fall back to walking the whole subtree
+        found = []
+        stack = [node]
+        while stack:
+            n = stack.pop()
+            if n.word is not None: found.append((n.weight, n.word))
+            stack.extend(n.children.values())
+        return [w for _, w in heapq.nlargest(k, found)]
+
+# --- Setup Data (100,000 Items) ---
+print("Generating 100,000 weighted words...")
+data_pool = [''.join(random.choices(string.ascii_uppercase, k=6)) for _ in range(100000)]
+# Popularity is heavy-tailed, like real query logs
+weights = {word: random.paretovariate(1.2) for word in data_pool}
+typed_words = random.sample(data_pool, 1000)
+K = 5
+
+layer3 = ThreeLayerList()
+trie = RadixTrie(top_k=10)
+
+print("--- BUILD BENCHMARK ---")
+start = time.perf_counter()
+for word in data_pool: layer3.add_unique(word)
+l3_build = time.perf_counter() - start
+
+start = time.perf_counter()
+for word in data_pool: trie.insert(word, weights[word])
+trie_build = time.perf_counter() - start
+
+print(f"3-Layer List:   {l3_build:.4f} s")
+print(f"Radix Trie:     {trie_build:.4f} s")
+print("")
+
+# --- BENCHMARK: KEYSTROKES ---
+# Every typed word is fed one character at a time, like a user typing into a search box.
+keystrokes = [word[:i] for word in typed_words for i in range(1, len(word) + 1)]
+print(f"--- AUTOCOMPLETE BENCHMARK ({len(keystrokes)} keystrokes, top {K}) ---")
+
+start = time.perf_counter()
+for prefix in keystrokes: bucket_complete(layer3, weights, prefix, K)
+bucket_time = time.perf_counter() - start
+
+start = time.perf_counter()
+for prefix in keystrokes: trie.complete(prefix, K)
+trie_time = time.perf_counter() - start
+
+print(f"3-Layer Fan-out:  {bucket_time:.6f} s  ({bucket_time / len(keystrokes) * 1e6:.1f} us/keystroke)")
+print(f"Radix Trie:       {trie_time:.6f} s  ({trie_time / len(keystrokes) * 1e6:.1f} us/keystroke)")
+print(f"Speed Increase:   {bucket_time / trie_time:.1f}x FASTER")
+
+# Per prefix length, so you can see the trie stays flat while fan-out explodes on short prefixes
+print("\nBy prefix length:")
+for length in range(1, 7):
+    group = [p for p in keystrokes if len(p) == length]
+    start = time.perf_counter()
+    for prefix in group: bucket_complete(layer3, weights, prefix, K)
+    b = time.perf_counter() - start
+    start = time.perf_counter()
+    for prefix in group: trie.complete(prefix, K)
+    t = time.perf_counter() - start
+    print(f"  {length} chars:  fan-out {b / len(group) * 1e6:9.1f} us   trie {t / len(group) * 1e6:6.1f} us")
+
+# Sanity check: both methods must return the same best completions
+agree = all(bucket_complete(layer3, weights, p, K) == trie.complete(p, K) for p in keystrokes[:600])
+print(f"\nResults match the fan-out search: {agree}")
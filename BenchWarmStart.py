@@ -0,0 +1,223 @@
+import os
+import time
+import random
+import shutil
+import json
+import threading
+import collections
+
+# --- Configuration ---
+DB_ROOT = "my_warmstart_index"
+STATS_FILE = "warmstart_stats.json"   # Bucket access counts, persisted on shutdown
+RECORD_SIZE = 65535          # 64KB per record, same as BenchDisk2.py
+TOTAL_RECORDS = 4000         # ~250 MB of buckets
+HOT_TARGETS = 100            # Like BenchDisk2.py: a handful of buckets get every hit
+LOOKUP_COUNT = 5000
+WARM_BUDGET = 32 * 1024 * 1024   # Bytes of bucket data the warm-up may pull into RAM
+DECAY = 0.5                  # Counts carried over from the previous run are scaled by this
+MIN_COUNT = 1.0              # Decayed counts below this are dropped instead of saved
+STATS_KEEP = 10000           # At most this many buckets are saved (the hottest ones)
+FIRST_WINDOW = 1000          # "Right after a deploy": the first N lookups
+
+HAS_FADVISE = hasattr(os, "posix_fadvise")
+
+# --- 1. The Disk Indexer (The "Control") ---
+class DiskIndexer:
+    def __init__(self, root_dir):
+        self.root = root_dir
+        if not os.path.exists(self.root):
+            os.makedirs(self.root)
+
+    def _get_path(self, data_chunk):
+        d1 = f"{data_chunk[0]:02x}"
+        d2 = f"{data_chunk[1]:02x}"
+        d3 = f"{data_chunk[2]:02x}"
+        folder_path = os.path.join(self.root, d1, d2)
+        file_path = os.path.join(folder_path, f"bucket_{d3}.bin")
+        return folder_path, file_path
+
+    def add(self, data_chunk):
+        folder_path, file_path = self._get_path(data_chunk)
+        os.makedirs(folder_path, exist_ok=True)
+        with open(file_path, "ab") as f:
+            f.write(data_chunk)
+
+    def find(self, data_chunk):
+        _, file_path = self._get_path(data_chunk)
+        if not os.path.exists(file_path): return False
+        with open(file_path, "rb") as f:
+            while True:
+                record = f.read(RECORD_SIZE)
+                if not record: break
+                if record == data_chunk: return True
+        return False
+
+# --- 2. The Warm-Start Disk Indexer ---
+class WarmDiskIndexer(DiskIndexer):
+    def __init__(self, root_dir, stats_file=STATS_FILE, budget=WARM_BUDGET):
+        # Counts every find() per bucket, saves the counts on close(), and on the next
+        # start loads the hottest buckets into RAM in the background (up to `budget` bytes).
+        super().__init__(root_dir)
+        self.stats_file = stats_file
+        self.budget = budget
+        self.access = collections.Counter()    # 3-byte prefix -> finds this run (+ decayed history)
+        self.warm = {}                         # 3-byte prefix -> tuple of the bucket's records
+        self.warm_bytes = 0
+        self.lock = threading.Lock()           # Keeps add() and the warm-up from racing on a bucket
+        self.warmer = None
+        self._load_stats()
+
+    def _load_stats(self):
+        try:
+            with open(self.stats_file) as f:
+                saved = json.load(f)
+        except (OSError, ValueError):
+            return
+        # Old counts still rank buckets, but fade so today's traffic can overtake them
+        for prefix, count in saved.items():
+            self.access[bytes.fromhex(prefix)] = count * DECAY
+
+    def save_stats(self):
+        # Only the hottest buckets are kept: a bucket nobody touches fades below
+        # MIN_COUNT after a few restarts and drops out, so the file never just grows.
+        # Write-then-rename, so a crash mid-save never leaves a half-written file behind.
+        kept = {prefix.hex(): count for prefix, count in self.access.most_common(STATS_KEEP) if count >= MIN_COUNT}
+        tmp_path = self.stats_file + ".tmp"
+        with open(tmp_path, "w") as f:
+            json.dump(kept, f)
+        os.replace(tmp_path, self.stats_file)
+
+    def warm_up(self):
+        # Returns at once; lookups are served from disk until their bucket arrives
+        self.warmer = threading.Thread(target=self._preload, daemon=True)
+        self.warmer.start()
+        return self.warmer
+
+    def _preload(self):
+        for prefix, _ in self.access.most_common():
+            _, file_path = self._get_path(prefix)
+            try:
+                size = os.path.getsize(file_path)
+            except OSError:
+                continue    # Bucket file is gone since the counts were saved
+            # Hottest first: once the next bucket doesn't fit, the rest aren't worth a stat() each
+            if self.warm_bytes + size > self.budget: break
+            with self.lock:
+                with open(file_path, "rb") as f:
+                    data = f.read()
+                # Split into records once here, so a lookup is a plain `in` over a few
+                # records (bytes.find with a 64KB needle costs ~300us, a compare ~2us)
+                self.warm[prefix] = tuple(data[i:i + RECORD_SIZE] for i in range(0, len(data), RECORD_SIZE))
+                self.warm_bytes += len(data)
+
+    def add(self, data_chunk):
+        with self.lock:
+            super().add(data_chunk)
+            # Drop the stale in-memory copy; the disk path serves this bucket from now on
+            records = self.warm.pop(data_chunk[:3], None)
+            if records is not None: self.warm_bytes -= len(records) * RECORD_SIZE
+
+    def find(self, data_chunk):
+        prefix = data_chunk[:3]
+        records = self.warm.get(prefix)
+        if records is not None:
+            self.access[prefix] += 1
+            return data_chunk in records
+        _, file_path = self._get_path(data_chunk)
+        if not os.path.exists(file_path): return False
+        # Only buckets that exist are counted, so random misses don't bloat the stats
+        self.access[prefix] += 1
+        with open(file_path, "rb") as f:
+            while True:
+                record = f.read(RECORD_SIZE)
+                if not record: break
+                if record == data_chunk: return True
+        return False
+
+    def close(self):
+        self.save_stats()
+
+# --- Measurement Helpers ---
+def drop_from_cache(root_dir):
+    # Simulates a restart on a busy box: the buckets are no longer in the page cache
+    if not HAS_FADVISE: return
+    for folder_path, _, files in os.walk(root_dir):
+        for name in files:
+            fd = os.open(os.path.join(folder_path, name), os.O_RDONLY)
+            try:
+                os.posix_fadvise(fd, 0, 0, os.POSIX_FADV_DONTNEED)
+            finally:
+                os.close(fd)
+
+def percentile(values, p):
+    values = sorted(values)
+    return values[min(len(values) - 1, int(len(values) * p / 100))]
+
+def timed_lookups(indexer, lookup_list):
+    latencies = []
+    hits = 0
+    for item in lookup_list:
+        start = time.perf_counter()
+        if indexer.find(item): hits += 1
+        latencies.append(time.perf_counter() - start)
+    return latencies, hits
+
+def report(label, latencies, hits):
+    first = latencies[:FIRST_WINDOW]
+    print(f"{label:<28} first {FIRST_WINDOW}: p50 {percentile(first, 50) * 1e6:7.0f}us  p99 {percentile(first, 99) * 1e6:7.0f}us"
+          f"   all: p99 {percentile(latencies, 99) * 1e6:7.0f}us  total {sum(latencies):.3f}s  hits {hits}")
+
+# --- SETUP ---
+print(f"--- WARM-START DEMO ---")
+print(f"Record Size: {RECORD_SIZE} bytes  Total Records: {TOTAL_RECORDS}  Warm Budget: {WARM_BUDGET / 1024 / 1024:.0f} MB")
+print(f"posix_fadvise: {HAS_FADVISE}")
+
+shutil.rmtree(DB_ROOT, ignore_errors=True)
+if os.path.exists(STATS_FILE): os.remove(STATS_FILE)
+builder = DiskIndexer(DB_ROOT)
+known_targets = []
+
+print("\nBuilding index...")
+start_time = time.perf_counter()
+for i in range(TOTAL_RECORDS):
+    chunk = os.urandom(RECORD_SIZE)
+    if len(known_targets) < HOT_TARGETS and random.random() < 0.05:
+        known_targets.append(chunk)
+    builder.add(chunk)
+print(f"Build Complete. Time: {time.perf_counter() - start_time:.2f}s")
+os.sync()
+
+def make_lookups():
+    # 50% hits on the hot targets, 50% random misses - same mix as BenchDisk2.py
+    return [random.choice(known_targets) if random.random() > 0.5 else os.urandom(RECORD_SIZE)
+            for _ in range(LOOKUP_COUNT)]
+
+# --- BENCHMARK ---
+print(f"\n--- {LOOKUP_COUNT} LOOKUPS PER RUN ---")
+
+# Run 1: the previous deployment. Serves traffic, learns which buckets are hot, saves on shutdown.
+previous = WarmDiskIndexer(DB_ROOT)
+timed_lookups(previous, make_lookups())
+latencies, hits = timed_lookups(previous, make_lookups())
+report("Steady state (warm cache)", latencies, hits)
+previous.close()
+with open(STATS_FILE) as f:
+    saved = len(json.load(f))
+print(f"Saved access counts for {saved} of {len(previous.access)} buckets to {STATS_FILE}")
+
+# Run 2: restart with no warm-up - every first touch of a hot bucket is a cold read
+drop_from_cache(DB_ROOT)
+latencies, hits = timed_lookups(DiskIndexer(DB_ROOT), make_lookups())
+report("Restart, cold", latencies, hits)
+
+# Run 3: restart with warm-up - lookups start immediately, the preload runs beside them
+drop_from_cache(DB_ROOT)
+restarted = WarmDiskIndexer(DB_ROOT)
+start = time.perf_counter()
+restarted.warm_up()
+latencies, hits = timed_lookups(restarted, make_lookups())
+report("Restart, warm-up", latencies, hits)
+restarted.warmer.join()
+print(f"Warm-up loaded {len(restarted.warm)} buckets ({restarted.warm_bytes / 1024 / 1024:.1f} MB) "
+      f"in {time.perf_counter() - start:.2f}s")
+restarted.close()